@@ -0,0 +1,77 @@
+# JIRA 导出基准测试（离线，使用合成数据）
+# pip install jira pandas xlsxwriter pyarrow
+# py bench_jira.py [issue数量，默认100000]
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from jira import JIRA
+from jira.resources import Issue
+
+from jira_changelog import flatten_changelogs, status_intervals, workflow_metrics
+from jira_synthetic import SERVER, make_raw_issues, make_changelog
+from test_jira import DEFAULT_COLUMNS, ROW_WRITERS, issue_to_row, extract_columns, key_column
+
+def bench_resource_rows(raw_issues):
+    """原路径：每个issue构造 Issue 资源对象，再按属性取值逐行组装"""
+    options = dict(JIRA.DEFAULT_OPTIONS, server=SERVER)
+    data = []
+    for raw in raw_issues:
+        issue = Issue(options, None, raw=raw)
+        data.append(issue_to_row(issue, DEFAULT_COLUMNS))
+    return pd.DataFrame(data)
+
+def bench_raw_columns(raw_issues):
+    """快速路径：直接从原始JSON按列抽取"""
+    return pd.DataFrame(extract_columns(raw_issues, DEFAULT_COLUMNS))
+
+def bench_formats(raw_issues):
+    """各导出格式的写入耗时和文件大小，返回 [(格式, 秒, 字节数)]"""
+    arrays = extract_columns(raw_issues, DEFAULT_COLUMNS)
+    headers = list(arrays)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt, writer in ROW_WRITERS.items():
+            output_file = os.path.join(directory, f'bench.{fmt}')
+            rows = zip(*arrays.values())
+            _, seconds = timed(writer, headers, rows, output_file, key_column(DEFAULT_COLUMNS), len(raw_issues) + 1)
+            results.append((fmt, seconds, os.path.getsize(output_file)))
+    return results
+
+def bench_changelog(issue_count, transitions=20):
+    """changelog 展开 + 向量化计算状态停留/周期/重开，返回耗时（秒）"""
+    raw_issues = make_raw_issues(issue_count)
+    for index, raw in enumerate(raw_issues):
+        histories = make_changelog(index, transitions=transitions)
+        raw['changelog'] = {'startAt': 0, 'maxResults': len(histories), 'total': len(histories), 'histories': histories}
+    start = time.perf_counter()
+    workflow_metrics(status_intervals(flatten_changelogs(raw_issues)))
+    return time.perf_counter() - start
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"生成 {count} 个合成issue...")
+    raw_issues = make_raw_issues(count)
+
+    df_resource, resource_seconds = timed(bench_resource_rows, raw_issues)
+    df_raw, raw_seconds = timed(bench_raw_columns, raw_issues)
+    assert len(df_resource) == len(df_raw) == count
+
+    print(f"Issue资源对象逐行: {resource_seconds:.2f}s ({count / resource_seconds:,.0f} issues/s)")
+    print(f"原始JSON按列抽取: {raw_seconds:.2f}s ({count / raw_seconds:,.0f} issues/s)")
+    print(f"加速比: {resource_seconds / raw_seconds:.1f}x")
+
+    print(f"\n{'格式':<8}{'耗时(s)':>10}{'行/秒':>12}{'大小(MB)':>10}")
+    for fmt, seconds, size in bench_formats(raw_issues):
+        print(f"{fmt:<8}{seconds:>10.2f}{count / seconds:>12,.0f}{size / 1024 / 1024:>10.1f}")
+
+    changelog_count = count // 2
+    print(f"\nchangelog分析（{changelog_count} 个issue × 20次流转）: {bench_changelog(changelog_count):.2f}s")
@@ -0,0 +1,170 @@
+# JIRA 导出流程基准测试套件（离线）
+# 启动本地模拟JIRA服务器（mock_jira_server.py），对各导出引擎分别在子进程中运行，
+# 测量吞吐量(issues/s)、首行写出时间、峰值内存(RSS)，避免引擎之间互相影响内存统计；
+# 输出文件的行数与issue数量不一致（引擎出错后打印了错误就返回）时标记失败，退出码非0
+# pip install jira pandas xlsxwriter aiohttp
+# py bench_jira_export.py                                   默认 1k/10k/100k，全部引擎
+# py bench_jira_export.py --sizes 1000,10000 --latency 0.05 --engines stream,async --json bench.json
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from mock_jira_server import start_mock_server
+
+ENGINES = ['pandas', 'pandas_raw', 'stream', 'stream_raw', 'parallel', 'async']
+JQL = 'project IN (FERA, ER23282) ORDER BY created DESC'
+
+def peak_rss_mb():
+    """当前进程的峰值内存（MB）"""
+    try:
+        import resource
+        # Linux 下 ru_maxrss 单位为KB
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        # Windows 没有 resource 模块
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+
+def probe_first_row(writer, marks):
+    """包装逐行写入函数，记录第一行交给写入函数的时间"""
+    def wrapped(headers, rows, *args, **kwargs):
+        def probed():
+            for row in rows:
+                marks.setdefault('first_row', time.perf_counter())
+                yield row
+        return writer(headers, probed(), *args, **kwargs)
+    return wrapped
+
+def count_rows(output_file):
+    """输出工作簿中的数据行数（各工作表去掉标题行，不含隐藏的摘要工作表），文件不存在时为0"""
+    import openpyxl
+
+    from test_jira import BASELINE_SHEET
+
+    if not os.path.exists(output_file):
+        return 0
+    workbook = openpyxl.load_workbook(output_file, read_only=True)
+    try:
+        rows = 0
+        for worksheet in workbook.worksheets:
+            if worksheet.title.startswith(BASELINE_SHEET):
+                continue
+            # 只读模式按 dimension 取行数，不逐行读取
+            max_row = worksheet.max_row
+            if max_row is None:
+                max_row = sum(1 for _ in worksheet.iter_rows(values_only=True))
+            rows += max(max_row - 1, 0)
+        return rows
+    finally:
+        workbook.close()
+
+def run_engine(engine, base_url, output_dir):
+    """子进程中运行一个导出引擎，返回测量结果"""
+    import pandas as pd
+    from jira import JIRA
+
+    import jira_async
+    import test_jira
+    from jira_governor import RequestGovernor, install_governor
+
+    marks = {}
+    test_jira.ROW_WRITERS['xlsx'] = probe_first_row(test_jira.ROW_WRITERS['xlsx'], marks)
+    jira_async.write_rows_to_excel_stream = probe_first_row(jira_async.write_rows_to_excel_stream, marks)
+    # pandas 路径在全部拉取完成后才开始写文件，以创建 ExcelWriter 的时间作为首行时间
+    excel_writer = pd.ExcelWriter
+
+    def probed_excel_writer(*args, **kwargs):
+        marks.setdefault('first_row', time.perf_counter())
+        return excel_writer(*args, **kwargs)
+    test_jira.pd.ExcelWriter = probed_excel_writer
+
+    output_file = os.path.join(output_dir, f'{engine}.xlsx')
+    start = time.perf_counter()
+    if engine == 'async':
+        jira_async.export_jira_to_excel_async(base_url, None, None, JQL, output_file, concurrency=8,
+                                              governor=RequestGovernor(initial=8, maximum=8))
+    else:
+        jira = JIRA(server=base_url, get_server_info=False, max_retries=0)
+        install_governor(jira, RequestGovernor(initial=8, maximum=8))
+        if engine == 'pandas':
+            test_jira.export_jira_to_excel(jira, JQL, output_file)
+        elif engine == 'pandas_raw':
+            test_jira.export_jira_to_excel(jira, JQL, output_file, raw=True)
+        elif engine == 'stream':
+            test_jira.export_jira_to_excel_stream(jira, JQL, output_file, page_size=100)
+        elif engine == 'stream_raw':
+            test_jira.export_jira_to_excel_stream(jira, JQL, output_file, page_size=100, raw=True)
+        elif engine == 'parallel':
+            test_jira.export_jira_to_excel_stream(jira, JQL, output_file, page_size=100, workers=8)
+        else:
+            raise ValueError(f"未知引擎: {engine}")
+
+    seconds = time.perf_counter() - start
+    return {
+        'engine': engine,
+        'seconds': seconds,
+        'rows': count_rows(output_file),
+        'first_row': marks.get('first_row', start + seconds) - start,
+        'peak_rss_mb': peak_rss_mb(),
+        'file_mb': os.path.getsize(output_file) / 1024 / 1024 if os.path.exists(output_file) else 0,
+    }
+
+def bench(sizes, engines, latency):
+    """对每个规模启动一个模拟服务器，依次在子进程中运行各引擎，返回 (结果, 是否有引擎失败)"""
+    results = []
+    failed = False
+    for size in sizes:
+        server, base_url = start_mock_server(size, latency)
+        try:
+            for engine in engines:
+                with tempfile.TemporaryDirectory() as output_dir:
+                    completed = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), '--run', engine, base_url, output_dir],
+                        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+                if completed.returncode != 0:
+                    print(f"❌ {engine} @ {size} 失败:\n{completed.stderr}")
+                    failed = True
+                    continue
+                result = json.loads(completed.stdout.strip().splitlines()[-1])
+                result['issues'] = size
+                result['issues_per_second'] = size / result['seconds']
+                # 出错后提前返回的引擎耗时更短，不能计入排名
+                result['failed'] = result['rows'] != size
+                results.append(result)
+                if result['failed']:
+                    failed = True
+                    print(f"❌ {engine} @ {size} 只写出 {result['rows']}/{size} 行，结果无效")
+                    continue
+                print(f"{size:>8} {engine:<12}{result['seconds']:>9.2f}{result['issues_per_second']:>12,.0f}"
+                      f"{result['first_row']:>10.2f}{result['peak_rss_mb']:>10.0f}")
+        finally:
+            server.shutdown()
+    return results, failed
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--run':
+        # 子进程：运行单个引擎，最后一行输出JSON结果
+        engine, base_url, output_dir = sys.argv[2:5]
+        print(json.dumps(run_engine(engine, base_url, output_dir)))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description='JIRA 导出流程离线基准测试')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='issue数量，逗号分隔')
+    parser.add_argument('--engines', default=','.join(ENGINES), help=f'引擎，逗号分隔：{",".join(ENGINES)}')
+    parser.add_argument('--latency', type=float, default=0.02, help='模拟服务器每个请求的延迟（秒）')
+    parser.add_argument('--json', help='结果另存为JSON文件')
+    args = parser.parse_args()
+
+    print(f"{'issues':>8} {'引擎':<12}{'耗时(s)':>9}{'issues/s':>12}{'首行(s)':>10}{'峰值MB':>10}")
+    results, failed = bench([int(size) for size in args.sizes.split(',')], args.engines.split(','), args.latency)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+        print(f"结果已保存到: {args.json}")
+    if failed:
+        sys.exit(1)
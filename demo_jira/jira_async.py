@@ -0,0 +1,266 @@
+# JIRA asyncio 导出引擎
+# jira 库是同步的，只能靠线程重叠请求；这里用一个带连接池（长连接）的 aiohttp 会话直接调用
+# 搜索、changelog、附件 REST 接口，并发数由连接池上限和信号量控制；每个请求同样经过 jira_governor
+# （与同步客户端共享并发窗口、429/503 暂停和重试），
+# 拉到的原始JSON交给与 export_jira_to_excel 相同的按列抽取/写入流程
+# pip install aiohttp xlsxwriter
+# py jira_async.py              使用 jira_config.ini 中的服务器导出
+# py jira_async.py --mock 10000 在本地模拟服务器上测吞吐量
+
+# DOC REF
+# https://docs.aiohttp.org/en/stable/client_advanced.html#limiting-connection-pool-size
+# https://developer.atlassian.com/cloud/jira/platform/rest/v2/api-group-issues/#api-rest-api-2-issue-issueidorkey-changelog-get
+
+import asyncio
+import queue
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+from test_jira import (load_config, get_jira_from_config, get_all_filters, interactive_key_selector, resolve_columns,
+                       DEFAULT_COLUMNS, projection_fields, extract_columns, key_column, write_rows_to_excel_stream)
+from jira_governor import GOVERNOR, RETRY_STATUSES, THROTTLE_STATUSES, retry_after_seconds
+from jira_progress import PROGRESS
+
+SEARCH_PATH = '/rest/api/2/search'
+CHANGELOG_PATH = '/rest/api/2/issue/{key}/changelog'
+
+class AsyncJiraClient:
+    """共享一个 aiohttp 会话（keep-alive 连接池）的异步JIRA客户端"""
+
+    def __init__(self, server, username=None, api_token=None, concurrency=8, timeout=30, governor=GOVERNOR):
+        self.server = server.rstrip('/')
+        self.governor = governor
+        self.auth = aiohttp.BasicAuth(username, api_token) if username else None
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.session = None
+        self.semaphore = None
+        # 最近一次 search_pages 的结果总数
+        self.total = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            auth=self.auth,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'Accept': 'application/json'},
+        )
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    def url(self, path):
+        return path if path.startswith('http') else self.server + path
+
+    async def acquire(self):
+        """在线程中等待调度器放行（不阻塞事件循环）；等待期间被取消时，线程拿到的名额随即归还"""
+        waiter = asyncio.ensure_future(asyncio.to_thread(self.governor.acquire))
+        try:
+            await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            waiter.add_done_callback(lambda _: self.governor.release())
+            raise
+
+    @asynccontextmanager
+    async def request(self, url, **kwargs):
+        """经过 RequestGovernor 调度的 GET（与 GovernedAdapter.send 相同的限流和重试），产出成功的响应"""
+        governor = self.governor
+        for attempt in range(governor.max_retries + 1):
+            await self.acquire()
+            try:
+                try:
+                    response = await self.session.get(url, **kwargs)
+                    error = None
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    response, error = None, e
+                if response is not None and response.status not in RETRY_STATUSES:
+                    if response.headers.get('X-RateLimit-NearLimit', '').lower() == 'true':
+                        governor.on_throttle()
+                    else:
+                        governor.on_success()
+                    try:
+                        response.raise_for_status()
+                        yield response
+                    finally:
+                        response.release()
+                    return
+            finally:
+                governor.release()
+
+            if attempt == governor.max_retries:
+                governor.count('failed')
+                if response is not None:
+                    response.release()
+                    response.raise_for_status()
+                raise error
+
+            # Retry-After: 0 表示立即重试
+            retry_after = retry_after_seconds(response) if response is not None else None
+            delay = governor.backoff(attempt) if retry_after is None else retry_after
+            governor.count('retried')
+            if response is not None:
+                response.release()
+            if response is not None and response.status in THROTTLE_STATUSES:
+                # 暂停对所有请求生效（同步线程和本事件循环），acquire 会等到暂停结束
+                governor.count('throttled')
+                governor.on_throttle(delay)
+            else:
+                await asyncio.sleep(delay)
+
+    async def get_json(self, path, params=None):
+        async with self.semaphore:
+            async with self.request(self.url(path), params=params) as response:
+                data = await response.json()
+                PROGRESS.add_bytes(response.content_length or 0)
+                return data
+
+    async def search_page(self, jql_query, start_at, max_results=100, fields=None, expand=None):
+        params = {'jql': jql_query, 'startAt': start_at, 'maxResults': max_results}
+        if fields:
+            params['fields'] = fields
+        if expand:
+            params['expand'] = expand
+        return await self.get_json(SEARCH_PATH, params)
+
+    async def search_pages(self, jql_query, fields=None, page_size=100, expand=None):
+        """异步生成器：第一页拿到 total 后，其余页并发请求，按顺序产出每页的原始issue列表"""
+        first = await self.search_page(jql_query, 0, page_size, fields, expand)
+        self.total = first.get('total')
+        yield first.get('issues', [])
+        # 服务器可能按自身上限返回比 page_size 少的条数，以实际页大小切分
+        step = len(first.get('issues', [])) or page_size
+        starts = iter(range(step, first.get('total', 0), step))
+        # 最多提前请求 2 倍并发数的页，写入慢时不会把全部结果堆在内存里
+        pending = deque()
+
+        def fill():
+            for start_at in starts:
+                pending.append(asyncio.ensure_future(self.search_page(jql_query, start_at, step, fields, expand)))
+                if len(pending) >= self.concurrency * 2:
+                    break
+
+        fill()
+        try:
+            while pending:
+                page = await pending.popleft()
+                fill()
+                yield page.get('issues', [])
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def changelog(self, key, page_size=100):
+        """分页获取单个issue的全部变更历史"""
+        histories = []
+        start_at = 0
+        while True:
+            page = await self.get_json(CHANGELOG_PATH.format(key=key), {'startAt': start_at, 'maxResults': page_size})
+            values = page.get('values', [])
+            histories.extend(values)
+            start_at += len(values)
+            if page.get('isLast', True) or not values:
+                return histories
+
+    async def changelogs(self, keys, page_size=100):
+        """并发获取多个issue的变更历史，返回 key -> histories"""
+        results = await asyncio.gather(*(self.changelog(key, page_size) for key in keys))
+        return dict(zip(keys, results))
+
+    async def download(self, url, path, offset=0, chunk_size=64 * 1024):
+        """流式下载附件到 path；offset > 0 时用 Range 续传，返回写入的字节数"""
+        headers = {'Range': f'bytes={offset}-'} if offset else None
+        written = 0
+        async with self.semaphore:
+            async with self.request(self.url(url), headers=headers) as response:
+                # 服务器不支持 Range 时返回完整内容，需要从头写
+                mode = 'ab' if offset and response.status == 206 else 'wb'
+                with open(path, mode) as f:
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        f.write(chunk)
+                        written += len(chunk)
+        return written
+
+def export_jira_to_excel_async(server, username, api_token, jql_query, output_file, columns=DEFAULT_COLUMNS,
+                               concurrency=8, page_size=100, governor=GOVERNOR):
+    """用异步引擎导出到Excel：事件循环负责并发拉取，写入线程按页顺序逐行写入，返回写入行数"""
+    pages = queue.Queue(maxsize=concurrency * 2)
+
+    def rows():
+        while True:
+            page = pages.get()
+            if page is None:
+                return
+            yield from zip(*extract_columns(page, columns).values())
+
+    def put(page):
+        # 写入线程出错退出后不再阻塞在满队列上
+        while not written.done():
+            try:
+                pages.put(page, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    async def produce():
+        try:
+            async with AsyncJiraClient(server, username, api_token, concurrency, governor=governor) as client:
+                async for page in client.search_pages(jql_query, projection_fields(columns), page_size):
+                    PROGRESS.on_page(len(page), client.total)
+                    await asyncio.to_thread(put, page)
+                    if written.done():
+                        break
+        finally:
+            await asyncio.to_thread(put, None)
+
+    headers = [header for header, _, _, _ in columns]
+    PROGRESS.begin()
+    try:
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            written = writer.submit(write_rows_to_excel_stream, headers, rows(), output_file, key_column(columns),
+                                    page_size)
+            asyncio.run(produce())
+            return written.result()
+    finally:
+        PROGRESS.finish()
+
+def measure_mock_throughput(issue_count, concurrency=8, latency=0.05):
+    """在本地模拟服务器上测量异步引擎的吞吐量"""
+    from mock_jira_server import start_mock_server
+
+    server, base_url = start_mock_server(issue_count, latency)
+    try:
+        start = time.perf_counter()
+        rows = export_jira_to_excel_async(base_url, None, None, 'project = FERA', 'jira_async_mock.xlsx',
+                                          concurrency=concurrency)
+        seconds = time.perf_counter() - start
+    finally:
+        server.shutdown()
+    print(f"异步引擎: {rows} 条 / {seconds:.2f}s = {rows / seconds:,.0f} issues/s"
+          f"（并发 {concurrency}，模拟延迟 {latency}s，请求 {server.request_count} 次）")
+    return rows / seconds
+
+if __name__ == '__main__':
+    print('MAIN_ENTRY')
+    if '--mock' in sys.argv:
+        position = sys.argv.index('--mock') + 1
+        count = int(sys.argv[position]) if position < len(sys.argv) else 10000
+        measure_mock_throughput(count)
+    else:
+        jira = get_jira_from_config()
+        filters = get_all_filters(jira)
+        jql_query = interactive_key_selector(filters)
+        if jql_query:
+            config = load_config()
+            jira_config = config['jira']
+            concurrency = config.getint('export', 'workers', fallback=8)
+            export_jira_to_excel_async(jira_config['server'], jira_config['username'], jira_config['api_token'],
+                                       jql_query, "jira_issues.xlsx", resolve_columns(jira), concurrency)
+            print("数据已导出到: jira_issues.xlsx")
@@ -0,0 +1,177 @@
+# JIRA 附件批量下载
+# 下载过滤器中所有issue的附件：有界线程池并发、分块流式写盘、未下完的文件用 Range 续传；
+# 内容相同的附件（同一份日志/截图挂在多个issue上）按 SHA-256 只存一份，按issue的目录用硬链接指向同一文件；
+# manifest.json 记录 issue key -> 本地路径，重复运行时跳过已完整下载的附件
+# pip install jira
+# py jira_attachments.py
+
+# DOC REF
+# https://developer.atlassian.com/cloud/jira/platform/rest/v2/api-group-issue-attachments/#api-rest-api-2-attachment-content-id-get
+# https://requests.readthedocs.io/en/latest/user/advanced/#body-content-workflow
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from test_jira import load_config, get_jira_from_config, get_all_filters, interactive_key_selector, iter_raw_pages
+
+ATTACHMENT_DIR = './attachments'
+MANIFEST_NAME = 'manifest.json'
+CHUNK_SIZE = 256 * 1024
+# Windows 文件名不允许的字符
+UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+def safe_filename(name):
+    return UNSAFE_CHARS.sub('_', name).strip() or 'unnamed'
+
+def collect_attachments(jira, jql_query, page_size=100):
+    """只请求 attachment 字段，返回 [(issue key, 附件元数据)]"""
+    return [(raw['key'], attachment)
+            for page in iter_raw_pages(jira, jql_query, page_size, 'attachment')
+            for raw in page for attachment in raw['fields'].get('attachment') or []]
+
+def load_manifest(directory):
+    path = os.path.join(directory, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {'attachments': {}, 'issues': {}}
+
+def save_manifest(directory, manifest):
+    # 先写临时文件再替换，中断时不会留下损坏的清单
+    path = os.path.join(directory, MANIFEST_NAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(path + '.tmp', path)
+
+def blob_path(directory, sha256, filename):
+    """按内容哈希存放的文件路径（保留原扩展名，便于直接打开）"""
+    extension = os.path.splitext(filename)[1].lower()
+    return os.path.join(directory, 'blobs', sha256[:2], sha256 + extension)
+
+def download_to_part(session, attachment, part_path):
+    """流式下载到 .part 文件，已有部分内容时用 Range 续传，返回 (sha256, 本次下载字节数)"""
+    sha256 = hashlib.sha256()
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if offset >= attachment['size']:
+        # 上次已下完但未来得及归档，或大小异常，从头下载
+        offset = 0
+    headers = {'Range': f'bytes={offset}-'} if offset else {}
+    with session.get(attachment['content'], headers=headers, stream=True) as response:
+        response.raise_for_status()
+        if offset and response.status_code == 206:
+            # 续传：已有部分也要计入哈希
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    sha256.update(chunk)
+            mode = 'ab'
+        else:
+            # 服务器不支持 Range 时返回完整内容，从头写
+            mode = 'wb'
+        received = 0
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+                sha256.update(chunk)
+                received += len(chunk)
+    size = os.path.getsize(part_path)
+    if size != attachment['size']:
+        raise IOError(f"大小不一致: {size} != {attachment['size']}")
+    return sha256.hexdigest(), received
+
+def link_issue_file(directory, key, attachment, target):
+    """issue目录下的文件硬链接到按哈希存放的文件，不占额外空间；不支持硬链接时复制
+
+    文件名为 <附件id>_<文件名>：同一issue上可能有多个同名附件（screenshot.png、log.txt）。
+    """
+    issue_dir = os.path.join(directory, 'issues', safe_filename(key))
+    os.makedirs(issue_dir, exist_ok=True)
+    path = os.path.join(issue_dir, safe_filename(f"{attachment['id']}_{attachment['filename']}"))
+    if not os.path.exists(path):
+        try:
+            os.link(target, path)
+        except OSError:
+            shutil.copyfile(target, path)
+    return path
+
+def download_attachments(jira, jql_query, directory=ATTACHMENT_DIR, workers=4):
+    """下载过滤器中所有issue的附件，返回 manifest"""
+    os.makedirs(os.path.join(directory, 'parts'), exist_ok=True)
+    manifest = load_manifest(directory)
+    done = manifest['attachments']
+    lock = threading.Lock()
+
+    items = collect_attachments(jira, jql_query)
+    print(f"📎 共 {len(items)} 个附件，{sum(attachment['size'] for _, attachment in items) / 1024 / 1024:.1f} MB")
+
+    def is_complete(attachment):
+        entry = done.get(attachment['id'])
+        if entry is None:
+            return False
+        path = os.path.join(directory, entry['path'])
+        return os.path.exists(path) and os.path.getsize(path) == attachment['size']
+
+    def fetch(attachment):
+        part_path = os.path.join(directory, 'parts', attachment['id'] + '.part')
+        sha256, received = download_to_part(jira._session, attachment, part_path)
+        target = blob_path(directory, sha256, attachment['filename'])
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with lock:
+            if os.path.exists(target):
+                # 相同内容已存在，只保留一份
+                os.remove(part_path)
+            else:
+                os.replace(part_path, target)
+            done[attachment['id']] = {'sha256': sha256, 'size': attachment['size'],
+                                      'path': os.path.relpath(target, directory)}
+        return received
+
+    # 同一附件只下载一次，已完整下载的跳过
+    pending = {attachment['id']: attachment for _, attachment in items if not is_complete(attachment)}
+    print(f"⏭️ 跳过已下载 {len({attachment['id'] for _, attachment in items}) - len(pending)} 个，"
+          f"待下载 {len(pending)} 个")
+    received = failed = 0
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(fetch, attachment): attachment for attachment in pending.values()}
+            for number, future in enumerate(as_completed(futures), 1):
+                attachment = futures[future]
+                try:
+                    received += future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"❌ {attachment['filename']} ({attachment['id']}) 下载失败: {e}")
+                if number % 50 == 0:
+                    print(f"已下载 {number}/{len(pending)} 个附件")
+    finally:
+        # 中断时也保存已完成的部分，下次运行跳过
+        issues = {}
+        for key, attachment in items:
+            entry = done.get(attachment['id'])
+            if entry is None:
+                continue
+            path = link_issue_file(directory, key, attachment, os.path.join(directory, entry['path']))
+            issues.setdefault(key, []).append({'id': attachment['id'], 'filename': attachment['filename'],
+                                               'sha256': entry['sha256'], 'path': os.path.relpath(path, directory)})
+        manifest['issues'].update(issues)
+        save_manifest(directory, manifest)
+
+    blobs = {entry['sha256'] for entry in done.values()}
+    print(f"✅ 本次下载 {received / 1024 / 1024:.1f} MB，失败 {failed} 个；"
+          f"{len(done)} 个附件去重后存储 {len(blobs)} 个文件，清单: {os.path.join(directory, MANIFEST_NAME)}")
+    return manifest
+
+if __name__ == '__main__':
+    print('MAIN_ENTRY')
+    jira = get_jira_from_config()
+    filters = get_all_filters(jira)
+    jql_query = interactive_key_selector(filters)
+    if jql_query:
+        config = load_config()
+        download_attachments(jira, jql_query,
+                             config.get('attachments', 'directory', fallback=ATTACHMENT_DIR),
+                             config.getint('attachments', 'workers', fallback=4))
@@ -0,0 +1,123 @@
+# JIRA 多过滤器批量导出
+# 一次导出多个（或全部）收藏过滤器，每个过滤器一个工作表，另加一个汇总表。
+# 各过滤器只拉取key列表（数据量很小），所有不重复的issue只按key批量拉取一次完整字段，
+# 过滤器之间重叠越多节省越多
+# pip install jira xlsxwriter
+# py jira_batch_export.py          交互选择过滤器（如 1,3,5 或 all）
+# py jira_batch_export.py --all    导出全部收藏过滤器
+
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import xlsxwriter
+
+from test_jira import (load_config, get_jira_from_config, get_all_filters, resolve_columns, projection_fields,
+                       key_column, iter_issue_pages, iter_raw_pages, extract_columns, write_rows_to_sheet)
+from jira_progress import PROGRESS
+
+# 只取key时每页条数（服务器可能按自身上限返回更少，分页逻辑按实际返回数推进）
+KEY_PAGE_SIZE = 1000
+# 每次 key in (...) 查询的issue数量
+KEY_BATCH_SIZE = 100
+# 工作表名称不允许的字符
+SHEET_NAME_PATTERN = re.compile(r'[\[\]:*?/\\]')
+
+def fetch_filter_keys(jira, jql_query):
+    """只拉取过滤器结果的key列表（保持过滤器自身的排序）"""
+    return [issue.key for page in iter_issue_pages(jira, jql_query, KEY_PAGE_SIZE, 'key') for issue in page]
+
+def fetch_rows_by_keys(jira, keys, columns, workers=4):
+    """按 key in (...) 批量拉取issue，每个key只请求一次，返回 key -> 行"""
+    fields = projection_fields(columns)
+    batches = [keys[i:i + KEY_BATCH_SIZE] for i in range(0, len(keys), KEY_BATCH_SIZE)]
+
+    def fetch_batch(batch):
+        jql = f'key in ({", ".join(batch)})'
+        rows = []
+        for page in iter_raw_pages(jira, jql, KEY_BATCH_SIZE, fields):
+            arrays = extract_columns(page, columns)
+            rows.extend(zip([raw['key'] for raw in page], zip(*arrays.values())))
+        return rows
+
+    rows_by_key = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for rows in executor.map(fetch_batch, batches):
+            rows_by_key.update(rows)
+    return rows_by_key
+
+def sheet_names(filter_names):
+    """过滤器名转为合法且不重复的工作表名（最长31个字符）"""
+    names = []
+    used = {'汇总'}
+    for name in filter_names:
+        base = SHEET_NAME_PATTERN.sub('_', name)[:31]
+        sheet_name = base
+        suffix = 2
+        while sheet_name in used:
+            sheet_name = f'{base[:31 - len(str(suffix)) - 1]}~{suffix}'
+            suffix += 1
+        used.add(sheet_name)
+        names.append(sheet_name)
+    return names
+
+def batch_export(jira, filters, output_file, columns, workers=4):
+    """批量导出多个过滤器：filters 为 {过滤器名: JQL}"""
+    names = list(filters)
+    # 1. 并发拉取各过滤器的key列表
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        keys_by_filter = dict(zip(names, executor.map(lambda name: fetch_filter_keys(jira, filters[name]), names)))
+    total = sum(len(keys) for keys in keys_by_filter.values())
+    unique_keys = list(dict.fromkeys(key for keys in keys_by_filter.values() for key in keys))
+    print(f"📋 {len(names)} 个过滤器共 {total} 条，去重后 {len(unique_keys)} 条")
+
+    # 2. 不重复的issue只拉取一次
+    PROGRESS.begin(len(unique_keys))
+    rows_by_key = fetch_rows_by_keys(jira, unique_keys, columns, workers)
+
+    # 3. 汇总表 + 每个过滤器一个工作表
+    headers = [header for header, _, _, _ in columns]
+    sheets = sheet_names(names)
+    workbook = xlsxwriter.Workbook(output_file, {'constant_memory': True})
+    try:
+        summary = workbook.add_worksheet('汇总')
+        summary.set_column('A:A', 40)
+        summary.set_column('D:D', 80)
+        summary.write_row(0, 0, ['过滤器', '工作表', 'issue数', 'JQL'])
+        for row, (name, sheet_name) in enumerate(zip(names, sheets), 1):
+            summary.write_row(row, 0, [name, sheet_name, len(keys_by_filter[name]), filters[name]])
+        for name, sheet_name in zip(names, sheets):
+            rows = (rows_by_key[key] for key in keys_by_filter[name] if key in rows_by_key)
+            write_rows_to_sheet(workbook, sheet_name, headers, rows, key_column(columns))
+    finally:
+        workbook.close()
+        PROGRESS.finish()
+    print(f"数据已导出到: {output_file}")
+    return keys_by_filter
+
+def select_filters(filters):
+    """交互选择多个过滤器，输入序号列表（如 1,3,5）或 all"""
+    names = list(filters)
+    print("========================================")
+    for number, name in enumerate(names, 1):
+        print(f"{number:>2}. {name}")
+    print("========================================")
+    while True:
+        user_input = input("\n请输入要导出的过滤器序号，用逗号分隔（all 为全部，q 退出）：\n> ").strip()
+        if user_input.lower() in ('exit', 'q'):
+            return {}
+        if user_input.lower() == 'all':
+            return filters
+        numbers = [part.strip() for part in user_input.split(',') if part.strip()]
+        if numbers and all(number.isdigit() and 1 <= int(number) <= len(names) for number in numbers):
+            return {names[int(number) - 1]: filters[names[int(number) - 1]] for number in numbers}
+        print(f"\n❌ 错误：'{user_input}' 不是有效的序号列表，请重新输入。")
+
+if __name__ == '__main__':
+    print('MAIN_ENTRY')
+    jira = get_jira_from_config()
+    filters = get_all_filters(jira)
+    selected = filters if '--all' in sys.argv else select_filters(filters)
+    if selected:
+        workers = load_config().getint('export', 'workers', fallback=4)
+        batch_export(jira, selected, "jira_batch.xlsx", resolve_columns(jira), workers)
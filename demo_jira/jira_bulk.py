@@ -0,0 +1,210 @@
+# JIRA 批量操作（按过滤器）
+# 选择过滤器后描述要做的修改（流转状态 / 分配经办人 / 更新字段），先预览每个issue的变化（dry-run），
+# 确认后用有界线程池并发执行，请求经 jira_governor 限流、重试；每个issue的结果追加写入 jira_bulk_log.jsonl，
+# 中途失败后用相同参数重新运行，日志中已成功的issue会跳过
+# pip install jira
+# py jira_bulk.py --transition Closed                                 只预览
+# py jira_bulk.py --transition Closed --comment "批量关闭" --apply
+# py jira_bulk.py --assign user01 --apply                             --assign none 取消分配
+# py jira_bulk.py --set "Issue Severity=S3-Major" --set "labels=triage,ota" --apply
+
+# DOC REF
+# https://developer.atlassian.com/cloud/jira/platform/rest/v2/api-group-issues/#api-rest-api-2-issue-issueidorkey-put
+# https://developer.atlassian.com/cloud/jira/platform/rest/v2/api-group-issues/#api-rest-api-2-issue-issueidorkey-transitions-post
+
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from jira_governor import GOVERNOR
+from test_jira import (load_config, get_jira_from_config, get_all_filters, get_all_fields, interactive_key_selector,
+                       load_field_index, iter_raw_pages, raw_value)
+
+BULK_LOG = './jira_bulk_log.jsonl'
+# 取消分配
+UNASSIGNED = ('none', '-')
+
+def field_payload(field, value):
+    """按字段类型把字符串值转换为编辑接口需要的格式"""
+    schema = field.get('schema', {})
+    field_type = schema.get('type')
+    if field_type == 'array':
+        items = [item.strip() for item in value.split(',') if item.strip()]
+        item_type = schema.get('items')
+        if item_type == 'option':
+            return [{'value': item} for item in items]
+        if item_type in ('version', 'component'):
+            return [{'name': item} for item in items]
+        return items
+    if field_type == 'option':
+        return {'value': value}
+    if field_type in ('priority', 'resolution', 'issuetype'):
+        return {'name': value}
+    if field_type == 'number':
+        return float(value)
+    return value
+
+def parse_field_updates(jira, specs):
+    """把 "字段=值" 列表解析为 [(字段id, 字段名, 提交值, 显示值)]，字段名可以是界面名称或字段id"""
+    index = load_field_index(jira)
+    if any(spec.partition('=')[0].strip() not in index for spec in specs):
+        index = load_field_index(jira, refresh=True)
+    fields = {field['id']: field for field in get_all_fields(jira)}
+    updates = []
+    for spec in specs:
+        name, separator, value = spec.partition('=')
+        name, value = name.strip(), value.strip()
+        if not separator or name not in index:
+            raise ValueError(f"无法识别的字段修改: {spec}（格式: 字段名=值）")
+        field = fields.get(index[name], {'id': index[name], 'name': name})
+        updates.append((field['id'], field['name'], field_payload(field, value), value))
+    return updates
+
+def operation_signature(operation):
+    """操作的唯一标识，续跑时只跳过同一操作已成功的issue"""
+    return json.dumps({'transition': operation['transition'], 'assign': operation['assign'],
+                       'fields': [(field_id, display) for field_id, _, _, display in operation['fields']]},
+                      ensure_ascii=False, sort_keys=True)
+
+def plan_changes(jira, jql_query, operation):
+    """预览：返回 [(key, [(项, 原值, 新值)])]，已是目标状态的issue不出现"""
+    fields = ['status', 'assignee'] + [field_id for field_id, _, _, _ in operation['fields']]
+    plans = []
+    for page in iter_raw_pages(jira, jql_query, fields=','.join(fields)):
+        for raw in page:
+            values = raw['fields']
+            changes = []
+            for field_id, name, _, display in operation['fields']:
+                old = raw_value(values.get(field_id))
+                if str(old) != display:
+                    changes.append((name, old, display))
+            if operation['assign'] is not False:
+                user = values.get('assignee') or {}
+                if user.get('accountId', user.get('name')) != operation['assign']:
+                    changes.append(('经办人', user.get('displayName'), operation['assign_name']))
+            if operation['transition']:
+                status = values['status']['name']
+                if status.lower() != operation['transition'].lower():
+                    changes.append(('状态', status, operation['transition']))
+            if changes:
+                plans.append((raw['key'], changes))
+    return plans
+
+def print_plan(plans, limit=50):
+    for key, changes in plans[:limit]:
+        print(f"{key}: " + '；'.join(f"{name}: {old} → {new}" for name, old, new in changes))
+    if len(plans) > limit:
+        print(f"...（共 {len(plans)} 个issue，只显示前 {limit} 个）")
+
+def find_transition(jira, key, target):
+    """按流转名称或目标状态名称查找流转id（不同工作流的id不同，需按issue查询）"""
+    for transition in jira.transitions(key):
+        if target.lower() in (transition['name'].lower(), transition['to']['name'].lower()):
+            return transition['id']
+    raise ValueError(f"{key} 当前状态下没有可到达 {target} 的流转")
+
+def apply_changes(jira, key, operation):
+    """对单个issue执行修改：先改字段、再分配，最后流转（关闭后的issue可能不允许编辑）"""
+    if operation['fields']:
+        payload = {'fields': {field_id: value for field_id, _, value, _ in operation['fields']}}
+        jira._session.put(jira._get_url(f'issue/{key}'), data=json.dumps(payload))
+    if operation['assign'] is not False:
+        user = operation['assign']
+        payload = {'accountId': user} if jira._is_cloud else {'name': user}
+        jira._session.put(jira._get_url(f'issue/{key}/assignee'), data=json.dumps(payload))
+    if operation['transition']:
+        jira.transition_issue(key, find_transition(jira, key, operation['transition']), comment=operation['comment'])
+
+def load_succeeded(log_file):
+    """日志中已成功的 (操作标识, issue key)"""
+    succeeded = set()
+    if os.path.exists(log_file):
+        with open(log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry['result'] == 'ok':
+                    succeeded.add((entry['operation'], entry['key']))
+    return succeeded
+
+def run_bulk(jira, plans, operations, workers=4, log_file=BULK_LOG):
+    """并发执行，operations 为 issue key -> 操作（可以各不相同），每个issue一条结果日志，返回 (成功数, 失败数, 跳过数)"""
+    signatures = {key: operation_signature(operations[key]) for key, _ in plans}
+    succeeded = load_succeeded(log_file)
+    pending = [(key, changes) for key, changes in plans if (signatures[key], key) not in succeeded]
+    skipped = len(plans) - len(pending)
+    if skipped:
+        print(f"⏭️ 日志中已成功 {skipped} 个，本次执行 {len(pending)} 个")
+    ok = failed = 0
+    with open(log_file, 'a', encoding='utf-8') as log, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(apply_changes, jira, key, operations[key]): (key, changes)
+                   for key, changes in pending}
+        for number, future in enumerate(as_completed(futures), 1):
+            key, changes = futures[future]
+            entry = {'time': datetime.now().isoformat(timespec='seconds'), 'operation': signatures[key], 'key': key,
+                     'changes': [[name, old, new] for name, old, new in changes]}
+            try:
+                future.result()
+                entry['result'] = 'ok'
+                ok += 1
+            except Exception as e:
+                entry['result'] = 'failed'
+                entry['error'] = getattr(e, 'text', None) or str(e)
+                failed += 1
+                print(f"❌ {key}: {entry['error']}")
+            # 每条立即落盘，中断后可续跑
+            log.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            log.flush()
+            if number % 50 == 0:
+                print(f"已处理 {number}/{len(pending)} 个issue")
+    print(f"✅ 成功 {ok} 个，失败 {failed} 个，跳过 {skipped} 个，结果日志: {log_file}")
+    return ok, failed, skipped
+
+def build_operation(jira, args):
+    """命令行参数 -> 操作描述"""
+    assign = False
+    assign_name = None
+    if args.assign is not None:
+        if args.assign.lower() in UNASSIGNED:
+            assign, assign_name = None, '未分配'
+        else:
+            # 只解析一次用户，不在每个issue上重复搜索
+            assign = jira._get_user_id(args.assign)
+            assign_name = args.assign
+    return {
+        'transition': args.transition,
+        'comment': args.comment,
+        'assign': assign,
+        'assign_name': assign_name,
+        'fields': parse_field_updates(jira, args.set or []),
+    }
+
+if __name__ == '__main__':
+    print('MAIN_ENTRY')
+    parser = argparse.ArgumentParser(description='按过滤器批量流转 / 分配 / 修改字段')
+    parser.add_argument('--transition', help='目标状态或流转名称，如 Closed')
+    parser.add_argument('--comment', help='流转时添加的备注')
+    parser.add_argument('--assign', help='经办人（用户名/accountId/邮箱），none 为取消分配')
+    parser.add_argument('--set', action='append', help='字段=值，可重复；多值字段用逗号分隔')
+    parser.add_argument('--apply', action='store_true', help='执行修改（默认只预览）')
+    parser.add_argument('--log', default=BULK_LOG, help='结果日志文件')
+    args = parser.parse_args()
+    if not (args.transition or args.assign is not None or args.set):
+        parser.error('至少指定 --transition / --assign / --set 之一')
+
+    jira = get_jira_from_config()
+    filters = get_all_filters(jira)
+    jql_query = interactive_key_selector(filters)
+    if jql_query:
+        operation = build_operation(jira, args)
+        plans = plan_changes(jira, jql_query, operation)
+        print_plan(plans)
+        if not plans:
+            print("没有需要修改的issue")
+        elif not args.apply:
+            print(f"\n预览模式：共 {len(plans)} 个issue需要修改，加 --apply 执行")
+        elif input(f"\n确认修改 {len(plans)} 个issue？(y/n) ").strip().lower() == 'y':
+            workers = load_config().getint('export', 'workers', fallback=4)
+            run_bulk(jira, plans, {key: operation for key, _ in plans}, workers, args.log)
+            GOVERNOR.report()
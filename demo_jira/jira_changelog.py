@@ -0,0 +1,172 @@
+# JIRA 状态流转分析
+# 按页批量拉取带 changelog 的搜索结果（expand=changelog），把状态流转展开成列式表，
+# 再用 pandas 向量化计算每个issue的各状态停留时间、周期时间、重开次数，以及按经办人的汇总
+# pip install jira pandas xlsxwriter
+# py jira_changelog.py
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from test_jira import load_config, get_jira_from_config, get_all_filters, interactive_key_selector
+
+# 统计用到的字段
+CHANGELOG_FIELDS = 'created,status,assignee'
+# JIRA 返回的时间格式，如 2025-01-01T08:00:00.000+0800（本地时间23个字符 + 时区偏移）
+JIRA_LOCAL_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+# 默认的开始处理/完成/状态，可在 jira_config.ini 的 [changelog] 段用逗号分隔覆盖
+DEFAULT_START_STATUSES = ['In Progress']
+DEFAULT_DONE_STATUSES = ['Resolved', 'Closed', 'Done']
+
+def fetch_changelog_pages(jira, jql_query, page_size=100, workers=4):
+    """批量拉取带 changelog 的原始issue页：先取第一页拿到总数，其余页并发拉取，按顺序产出"""
+    def fetch_page(start_at, max_results=page_size):
+        return jira.search_issues(jql_query, startAt=start_at, maxResults=max_results, fields=CHANGELOG_FIELDS,
+                                  expand='changelog', json_result=True)
+
+    first = fetch_page(0)
+    yield first.get('issues', [])
+    # 服务器可能按自身上限返回比 page_size 少的条数，以实际页大小切分
+    step = len(first.get('issues', [])) or page_size
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for page in executor.map(lambda start_at: fetch_page(start_at, step), range(step, first.get('total', 0), step)):
+            yield page.get('issues', [])
+
+def complete_changelog(jira, raw_issue):
+    """搜索结果内嵌的 changelog 最多100条，超出部分单独分页补齐"""
+    changelog = raw_issue.get('changelog', {})
+    histories = changelog.get('histories', [])
+    start_at = len(histories)
+    while start_at < changelog.get('total', 0):
+        page = jira._get_json(f"issue/{raw_issue['key']}/changelog", params={'startAt': start_at, 'maxResults': 100})
+        values = page.get('values', [])
+        if not values:
+            break
+        histories.extend(values)
+        start_at += len(values)
+    return histories
+
+def flatten_changelogs(raw_issues, arrays=None, jira=None):
+    """将一页issue的状态流转展开为列数组：每进入一个状态记一行（含创建时的初始状态）"""
+    if arrays is None:
+        arrays = {'key': [], 'assignee': [], 'status': [], 'start': []}
+    keys, assignees, statuses, starts = arrays['key'], arrays['assignee'], arrays['status'], arrays['start']
+    for raw in raw_issues:
+        fields = raw['fields']
+        histories = complete_changelog(jira, raw) if jira else raw.get('changelog', {}).get('histories', [])
+        transitions = sorted((history['created'], item['fromString'], item['toString'])
+                             for history in histories for item in history['items'] if item['field'] == 'status')
+        assignee = (fields.get('assignee') or {}).get('displayName', '未分配')
+        key = raw['key']
+        keys.append(key)
+        assignees.append(assignee)
+        statuses.append(transitions[0][1] if transitions else fields['status']['name'])
+        starts.append(fields['created'])
+        for created, _, to_status in transitions:
+            keys.append(key)
+            assignees.append(assignee)
+            statuses.append(to_status)
+            starts.append(created)
+    return arrays
+
+def parse_jira_times(values):
+    """把JIRA时间字符串批量转为UTC时间
+
+    带时区偏移的格式让 pd.to_datetime 逐个解析，百万行要好几秒；
+    这里本地时间部分走固定格式的快速解析，偏移只对去重后的几个值计算一次再按列相减。
+    """
+    values = pd.Series(values)
+    local = pd.to_datetime(values.str.slice(0, 23), format=JIRA_LOCAL_TIME_FORMAT)
+    offsets = values.str.slice(23)
+    deltas = {offset: (1 if offset[0] == '+' else -1) * pd.Timedelta(hours=int(offset[1:3]), minutes=int(offset[3:5]))
+              for offset in offsets.unique()}
+    return (local - offsets.map(deltas)).dt.tz_localize('UTC')
+
+def status_intervals(arrays, now=None):
+    """向量化计算每个状态区间的结束时间和时长（小时），最后一个区间截止到 now"""
+    now = now or pd.Timestamp.now(tz='UTC')
+    df = pd.DataFrame(arrays)
+    df['start'] = parse_jira_times(df['start'])
+    df.sort_values(['key', 'start'], inplace=True, kind='stable')
+    by_key = df.groupby('key', sort=False)
+    df['end'] = by_key['start'].shift(-1).fillna(now)
+    df['previous'] = by_key['status'].shift(1)
+    df['hours'] = (df['end'] - df['start']).dt.total_seconds() / 3600
+    return df
+
+def workflow_metrics(intervals, start_statuses=DEFAULT_START_STATUSES, done_statuses=DEFAULT_DONE_STATUSES):
+    """返回 (各状态停留时间表, 每个issue的周期指标表, 按经办人汇总表)"""
+    time_in_status = intervals.pivot_table(index='key', columns='status', values='hours', aggfunc='sum',
+                                           fill_value=0).round(1)
+
+    by_key = intervals.groupby('key', sort=False)
+    created = by_key['start'].min()
+    started = intervals[intervals['status'].isin(start_statuses)].groupby('key')['start'].min()
+    done = intervals[intervals['status'].isin(done_statuses)].groupby('key')['start'].max()
+    # 从完成状态回到未完成状态记为一次重开
+    reopened = intervals['previous'].isin(done_statuses) & ~intervals['status'].isin(done_statuses)
+
+    issues = pd.DataFrame({
+        '经办人': by_key['assignee'].first(),
+        '创建时间': created,
+        '完成时间': done,
+        '交付时间(h)': (done - created).dt.total_seconds() / 3600,
+        '周期时间(h)': (done - started).dt.total_seconds() / 3600,
+        '重开次数': reopened.groupby(intervals['key']).sum(),
+        '流转次数': by_key.size() - 1,
+    })
+    # 最后一次进入完成状态早于开始处理（或从未开始）时周期时间无意义
+    issues.loc[issues['周期时间(h)'] < 0, '周期时间(h)'] = float('nan')
+    issues['重开次数'] = issues['重开次数'].fillna(0).astype(int)
+
+    assignees = issues.groupby('经办人').agg(
+        issue数=('重开次数', 'size'),
+        平均交付时间_h=('交付时间(h)', 'mean'),
+        平均周期时间_h=('周期时间(h)', 'mean'),
+        周期时间中位数_h=('周期时间(h)', 'median'),
+        重开总数=('重开次数', 'sum'),
+    ).round(1)
+    status_by_assignee = time_in_status.join(issues['经办人']).groupby('经办人').mean().round(1)
+    assignees = assignees.join(status_by_assignee.add_prefix('平均停留_'))
+    return time_in_status, issues.round({'交付时间(h)': 1, '周期时间(h)': 1}), assignees
+
+def changelog_analytics(jira, jql_query, output_file, workers=4, start_statuses=DEFAULT_START_STATUSES,
+                        done_statuses=DEFAULT_DONE_STATUSES):
+    """拉取changelog并把分析结果写入Excel（状态停留时间、issue周期、经办人汇总三个工作表）"""
+    arrays = None
+    count = 0
+    for page in fetch_changelog_pages(jira, jql_query, workers=workers):
+        arrays = flatten_changelogs(page, arrays, jira)
+        count += len(page)
+        print(f"已拉取 {count} 个issue的changelog")
+    if not count:
+        print("过滤器结果为空")
+        return None
+
+    time_in_status, issues, assignees = workflow_metrics(status_intervals(arrays), start_statuses, done_statuses)
+    # Excel 不支持带时区的时间
+    for column in ('创建时间', '完成时间'):
+        issues[column] = issues[column].dt.tz_localize(None)
+    with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
+        issues.to_excel(writer, sheet_name='issue周期')
+        time_in_status.to_excel(writer, sheet_name='状态停留时间(h)')
+        assignees.to_excel(writer, sheet_name='经办人汇总')
+    print(f"数据已导出到: {output_file}")
+    return issues
+
+def status_list(config, option, default):
+    value = config.get('changelog', option, fallback='')
+    return [status.strip() for status in value.split(',') if status.strip()] or default
+
+if __name__ == '__main__':
+    print('MAIN_ENTRY')
+    jira = get_jira_from_config()
+    filters = get_all_filters(jira)
+    jql_query = interactive_key_selector(filters)
+    if jql_query:
+        config = load_config()
+        changelog_analytics(jira, jql_query, "jira_changelog.xlsx",
+                            workers=config.getint('export', 'workers', fallback=4),
+                            start_statuses=status_list(config, 'start_statuses', DEFAULT_START_STATUSES),
+                            done_statuses=status_list(config, 'done_statuses', DEFAULT_DONE_STATUSES))
@@ -0,0 +1,165 @@
+# JIRA 请求调度：自适应限流与重试
+# 挂载到 jira 客户端的 requests 会话上（jira_async 的 aiohttp 请求也经过同一个调度器），所有线程共享一个并发窗口（AIMD）：
+#   - 成功：窗口加性增长（每个窗口的请求成功后 +1）
+#   - 429 / 503 或 X-RateLimit-NearLimit：窗口减半，429 / 503 按 Retry-After 暂停所有请求
+#   - 只重试失败的那个请求，等待时间为带抖动的指数退避
+# 每次运行统计请求、限流、重试次数
+
+# DOC REF
+# https://developer.atlassian.com/cloud/jira/platform/rate-limiting/
+# https://requests.readthedocs.io/en/latest/user/advanced/#transport-adapters
+
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+
+# 需要重试的状态码
+RETRY_STATUSES = {429, 502, 503, 504}
+# 服务器要求降速的状态码
+THROTTLE_STATUSES = {429, 503}
+
+def retry_after_seconds(response):
+    """从 Retry-After / X-RateLimit-Reset 响应头解析需要等待的秒数，没有时返回None"""
+    value = response.headers.get('Retry-After')
+    if value:
+        if value.strip().isdigit():
+            return float(value)
+        try:
+            return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0)
+        except (TypeError, ValueError):
+            pass
+    reset = response.headers.get('X-RateLimit-Reset')
+    if reset:
+        try:
+            return max((datetime.fromisoformat(reset.replace('Z', '+00:00')) - datetime.now(timezone.utc))
+                       .total_seconds(), 0)
+        except ValueError:
+            pass
+    return None
+
+class RequestGovernor:
+    def __init__(self, initial=4, minimum=1, maximum=16, max_retries=5, base_delay=1.0, max_delay=60.0):
+        self.window = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.in_flight = 0
+        self.pause_until = 0.0
+        self.condition = threading.Condition()
+        self.stats = Counter()
+
+    def load_config(self, config):
+        """从 jira_config.ini 的 [governor] 段读取设置"""
+        if config.has_section('governor'):
+            section = config['governor']
+            self.window = section.getfloat('initial', self.window)
+            self.minimum = section.getint('minimum', self.minimum)
+            self.maximum = section.getint('maximum', self.maximum)
+            self.max_retries = section.getint('max_retries', self.max_retries)
+
+    def acquire(self):
+        """等待暂停结束且并发窗口有空位"""
+        with self.condition:
+            while True:
+                wait = self.pause_until - time.monotonic()
+                if wait > 0:
+                    self.condition.wait(wait)
+                elif self.in_flight < int(self.window):
+                    break
+                else:
+                    self.condition.wait()
+            self.in_flight += 1
+            self.stats['requests'] += 1
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def on_success(self):
+        with self.condition:
+            self.window = min(self.maximum, self.window + 1 / self.window)
+            self.condition.notify_all()
+
+    def on_throttle(self, delay=0.0):
+        """乘性减小窗口，delay > 0 时所有线程暂停到 delay 秒之后"""
+        with self.condition:
+            self.window = max(self.minimum, self.window / 2)
+            if delay > 0:
+                self.pause_until = max(self.pause_until, time.monotonic() + delay)
+
+    def count(self, name):
+        with self.condition:
+            self.stats[name] += 1
+
+    def backoff(self, attempt):
+        """带抖动的指数退避时间"""
+        return min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def report(self):
+        print(f"📊 请求 {self.stats['requests']} 次，限流 {self.stats['throttled']} 次，"
+              f"重试 {self.stats['retried']} 次，失败 {self.stats['failed']} 次，当前并发窗口 {int(self.window)}")
+
+class GovernedAdapter(HTTPAdapter):
+    """所有请求经过 RequestGovernor 调度的 requests 传输适配器"""
+
+    def __init__(self, governor, **kwargs):
+        self.governor = governor
+        kwargs.setdefault('pool_maxsize', governor.maximum)
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        governor = self.governor
+        for attempt in range(governor.max_retries + 1):
+            governor.acquire()
+            try:
+                response = super().send(request, **kwargs)
+                error = None
+            except (ConnectionError, Timeout) as e:
+                response, error = None, e
+            finally:
+                governor.release()
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                if response.headers.get('X-RateLimit-NearLimit', '').lower() == 'true':
+                    governor.on_throttle()
+                else:
+                    governor.on_success()
+                return response
+
+            if attempt == governor.max_retries:
+                governor.count('failed')
+                if response is not None:
+                    return response
+                raise error
+
+            # Retry-After: 0 表示立即重试，不能按假值退回指数退避
+            retry_after = retry_after_seconds(response) if response is not None else None
+            delay = governor.backoff(attempt) if retry_after is None else retry_after
+            governor.count('retried')
+            if response is not None and response.status_code in THROTTLE_STATUSES:
+                # 暂停对所有线程生效，acquire 会等到暂停结束
+                governor.count('throttled')
+                governor.on_throttle(delay)
+            else:
+                time.sleep(delay)
+            if response is not None:
+                response.close()
+
+def install_governor(jira, governor):
+    """把调度器挂到 jira 客户端的会话上（jira 自带的重试需关闭：JIRA(max_retries=0)）"""
+    adapter = GovernedAdapter(governor)
+    jira._session.mount('https://', adapter)
+    jira._session.mount('http://', adapter)
+    return jira
+
+# 全局调度器，同一进程内的所有JIRA请求共享
+GOVERNOR = RequestGovernor()
@@ -0,0 +1,194 @@
+# JIRA 导出表格修改回写
+# 在 test_jira.py 导出的 jira_issues.xlsx 中直接修改优先级、经办人、状态等列，再用本脚本把修改回写到JIRA。
+# 导出时（jira_config.ini 中 [export] baseline = true）隐藏工作表 _jira_baseline 记录了每行各单元格的摘要：整行摘要相同的行直接跳过，
+# 只有被修改的单元格才产生请求（1万行改200处约200次调用）；回写前按 key in (...) 批量查询当前值，
+# 导出后JIRA上已被别人修改的字段视为冲突，默认跳过。执行方式与 jira_bulk.py 相同：预览 -> 确认 -> 并发执行、结果日志可续跑
+# pip install jira openpyxl
+# py jira_import.py jira_issues.xlsx             只预览
+# py jira_import.py jira_issues.xlsx --apply
+
+# DOC REF
+# https://openpyxl.readthedocs.io/en/stable/optimized.html
+# https://developer.atlassian.com/cloud/jira/platform/rest/v2/api-group-issues/#api-rest-api-2-issue-issueidorkey-put
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import openpyxl
+
+from jira_batch_export import KEY_BATCH_SIZE
+from jira_bulk import field_payload, print_plan, run_bulk
+from jira_governor import GOVERNOR
+from jira_summary import assignable_users
+from test_jira import (load_config, get_jira_from_config, get_all_fields, resolve_columns, projection_fields,
+                       iter_raw_pages, raw_extractor, baseline_text, cell_digest, row_digest, BASELINE_SHEET)
+
+IMPORT_LOG = './jira_import_log.jsonl'
+# 导出列中不能直接修改的字段
+READONLY_FIELDS = {'key', 'issuetype', 'project', 'reporter', 'creator', 'created', 'updated', 'resolutiondate',
+                   'lastViewed', 'attachment', 'issuelinks'}
+
+def load_baseline(workbook):
+    """读取隐藏的摘要工作表，返回 (密钥列名, 列名列表, key -> (整行摘要, 各列摘要))"""
+    key_header = headers = None
+    baseline = {}
+    for worksheet in workbook.worksheets:
+        if not worksheet.title.startswith(BASELINE_SHEET):
+            continue
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows)
+        key_header, headers = header[0], list(header[2:])
+        for row in rows:
+            if row and row[0]:
+                baseline[row[0]] = (row[1], row[2].split())
+    return key_header, headers, baseline
+
+def read_edits(path):
+    """找出被修改的单元格，返回 (列名列表, key -> 导出时的摘要, [(key, {列名: 新值文本})])
+
+    按列名匹配（调整过列顺序也可以），删除的列视为未修改，新增的行和删除的行忽略。
+    """
+    # data_only：超链接公式（超出超链接上限的行）读取缓存的 key
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        key_header, headers, baseline = load_baseline(workbook)
+        if not baseline:
+            raise ValueError(f"{path} 中没有 {BASELINE_SHEET} 工作表，请在 jira_config.ini 中设置 [export] baseline = true 后用 test_jira.py 重新导出")
+        key_index = headers.index(key_header)
+        edits = []
+        for worksheet in workbook.worksheets:
+            if worksheet.title.startswith(BASELINE_SHEET):
+                continue
+            rows = worksheet.iter_rows(values_only=True)
+            sheet_headers = list(next(rows, None) or [])
+            if key_header not in sheet_headers:
+                continue
+            positions = [sheet_headers.index(header) if header in sheet_headers else None for header in headers]
+            complete = None not in positions
+            for row in rows:
+                texts = [baseline_text(row[position]) if position is not None and position < len(row) else None
+                         for position in positions]
+                entry = baseline.get(texts[key_index])
+                if entry is None:
+                    continue
+                base_row, base_cells = entry
+                # 整行摘要相同即未修改，绝大多数行到此为止
+                if complete and row_digest(texts) == base_row:
+                    continue
+                changed = {header: text for header, text, digest in zip(headers, texts, base_cells)
+                           if text is not None and cell_digest(text) != digest}
+                if changed:
+                    edits.append((texts[key_index], changed))
+        return headers, baseline, edits
+    finally:
+        workbook.close()
+
+def current_values(jira, keys, columns, workers=4):
+    """按 key in (...) 批量并发查询被修改列的当前值，返回 key -> {列名: 文本}"""
+    fields = projection_fields(columns)
+    extractors = [(header, raw_extractor(field_id, attrs, default)) for header, field_id, attrs, default in columns]
+    batches = [keys[i:i + KEY_BATCH_SIZE] for i in range(0, len(keys), KEY_BATCH_SIZE)]
+
+    def fetch_batch(batch):
+        return {raw['key']: {header: baseline_text(extract(raw)) for header, extract in extractors}
+                for page in iter_raw_pages(jira, f'key in ({", ".join(batch)})', KEY_BATCH_SIZE, fields)
+                for raw in page}
+
+    values = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for batch_values in executor.map(fetch_batch, batches):
+            values.update(batch_values)
+    return values
+
+def plan_import(jira, headers, baseline, edits, columns, config, force=False, workers=4):
+    """把修改转换为每个issue的操作，返回 (预览 [(key, [(列名, 原值, 新值)])], key -> 操作)"""
+    by_header = {column[0]: column for column in columns}
+    editable = set()
+    for header in {header for _, changed in edits for header in changed}:
+        if header not in by_header:
+            print(f"⚠️ 列 {header} 不在当前导出列配置中，忽略该列的修改")
+        elif by_header[header][1] in READONLY_FIELDS:
+            print(f"⚠️ 列 {header} 不能回写，忽略该列的修改")
+        else:
+            editable.add(header)
+    edits = [(key, {header: text for header, text in changed.items() if header in editable})
+             for key, changed in edits]
+    edits = [(key, changed) for key, changed in edits if changed]
+    if not edits:
+        return [], {}
+
+    changed_columns = [by_header[header] for header in sorted(editable)]
+    current = current_values(jira, [key for key, _ in edits], changed_columns, workers)
+    fields = {field['id']: field for field in get_all_fields(jira)}
+    users = None
+    user_ids = {}
+    plans = []
+    operations = {}
+    conflicts = 0
+    for key, changed in edits:
+        if key not in current:
+            print(f"⚠️ {key} 不存在或无权限，跳过")
+            continue
+        operation = {'transition': None, 'comment': None, 'assign': False, 'assign_name': None, 'fields': []}
+        changes = []
+        for header, text in changed.items():
+            _, field_id, _, default = by_header[header]
+            # 清空单元格与填写缺省值（如“未分配”）相同，都表示清空字段
+            if text == '' and default is not None:
+                text = default
+            now = current[key][header]
+            if now == text:
+                # JIRA上已是该值（如上次回写已成功）
+                continue
+            if cell_digest(now) != baseline[key][1][headers.index(header)] and not force:
+                print(f"⚠️ {key} 的 {header} 导出后已在JIRA上改为 {now!r}，跳过（--force 覆盖）")
+                conflicts += 1
+                continue
+            empty = text == '' or text == default
+            if field_id == 'status':
+                operation['transition'] = text
+            elif field_id == 'assignee':
+                if empty:
+                    operation['assign'], operation['assign_name'] = None, '未分配'
+                else:
+                    if users is None:
+                        users = {user['displayName']: user.get('accountId', user.get('name'))
+                                 for user in assignable_users(jira, config)}
+                    if text not in user_ids:
+                        user_ids[text] = users.get(text) or jira._get_user_id(text)
+                    operation['assign'], operation['assign_name'] = user_ids[text], text
+            else:
+                field = fields.get(field_id, {'id': field_id, 'name': header})
+                operation['fields'].append((field_id, header, None if empty else field_payload(field, text), text))
+            changes.append((header, now, text))
+        if changes:
+            plans.append((key, changes))
+            operations[key] = operation
+    if conflicts:
+        print(f"⚠️ 共 {conflicts} 处冲突未回写")
+    return plans, operations
+
+if __name__ == '__main__':
+    print('MAIN_ENTRY')
+    parser = argparse.ArgumentParser(description='把导出表格中的修改回写到JIRA')
+    parser.add_argument('workbook', nargs='?', default='jira_issues.xlsx', help='test_jira.py 导出的 xlsx 文件')
+    parser.add_argument('--apply', action='store_true', help='执行回写（默认只预览）')
+    parser.add_argument('--force', action='store_true', help='导出后JIRA上已被修改的字段也覆盖')
+    parser.add_argument('--log', default=IMPORT_LOG, help='结果日志文件')
+    args = parser.parse_args()
+
+    jira = get_jira_from_config()
+    config = load_config()
+    workers = config.getint('export', 'workers', fallback=4)
+    headers, baseline, edits = read_edits(args.workbook)
+    print(f"📄 {len(baseline)} 行中有 {len(edits)} 行被修改")
+    plans, operations = plan_import(jira, headers, baseline, edits, resolve_columns(jira), config, args.force,
+                                    workers)
+    print_plan(plans)
+    if not plans:
+        print("没有需要回写的修改")
+    elif not args.apply:
+        print(f"\n预览模式：共 {len(plans)} 个issue需要回写，加 --apply 执行")
+    elif input(f"\n确认回写 {len(plans)} 个issue？(y/n) ").strip().lower() == 'y':
+        run_bulk(jira, plans, operations, workers, args.log)
+        GOVERNOR.report()
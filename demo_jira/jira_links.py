@@ -0,0 +1,297 @@
+# JIRA issue关联图导出（阻塞链分析）
+# 拉取过滤器中issue的 issuelinks，过滤器外的关联issue用 key in (...) 批量并发补全（不逐个请求），
+# 关联图以紧凑的邻接数组（CSR）保存，计算最长阻塞链（只看未完成的issue）和连通分量，输出：
+#   - jira_links.xlsx：阻塞链、连通分量、节点、关联 四个工作表
+#   - jira_links.json：按列存放的节点和边，便于其他工具加载
+#   - jira_links.dot：Graphviz，阻塞链上的边标红；上万个节点时用 sfdp 布局
+# pip install jira xlsxwriter
+# py jira_links.py
+# sfdp -Tsvg jira_links.dot -o jira_links.svg
+
+# DOC REF
+# https://developer.atlassian.com/cloud/jira/platform/rest/v2/api-group-issue-links/
+# https://graphviz.org/doc/info/lang.html
+
+import json
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+import xlsxwriter
+
+from jira_batch_export import KEY_BATCH_SIZE
+from test_jira import (load_config, get_jira_from_config, get_all_filters, interactive_key_selector, iter_raw_pages,
+                       write_rows_to_sheet)
+from jira_progress import PROGRESS
+
+LINK_FIELDS = 'summary,status,issuelinks'
+DEFAULT_BLOCK_TYPES = ['Blocks']
+# 节点来源：过滤器内 / 按key补全 / 只出现在对方的 issuelinks 中（只有摘要和状态）
+FILTER, RESOLVED, EMBEDDED = 0, 1, 2
+SOURCE_NAMES = ['过滤器', '关联补全', '关联']
+DOT_LABEL_LENGTH = 30
+
+class LinkGraph:
+    """issue关联图：节点按出现顺序编号，边存放在三个整数数组中（起点、终点、关联类型）"""
+
+    def __init__(self):
+        self.index = {}
+        self.keys = []
+        self.summaries = []
+        self.statuses = []
+        self.done = bytearray()
+        self.sources = bytearray()
+        self.type_names = []
+        self.type_index = {}
+        self.edge_sources = array('i')
+        self.edge_targets = array('i')
+        self.edge_types = array('i')
+        # 两端的issue都会列出同一条关联，按关联id去重
+        self.link_ids = set()
+
+    def add_node(self, key, fields, source):
+        """添加或更新节点，来源更完整的信息覆盖较少的"""
+        node = self.index.get(key)
+        if node is None:
+            node = self.index[key] = len(self.keys)
+            self.keys.append(key)
+            self.summaries.append(None)
+            self.statuses.append(None)
+            self.done.append(0)
+            self.sources.append(source)
+        elif source > self.sources[node]:
+            return node
+        status = fields.get('status') or {}
+        self.summaries[node] = fields.get('summary')
+        self.statuses[node] = status.get('name')
+        self.done[node] = status.get('statusCategory', {}).get('key') == 'done'
+        self.sources[node] = source
+        return node
+
+    def add_issue(self, raw, source):
+        """添加issue及其全部关联：outwardIssue 为 本issue → 对方，inwardIssue 为 对方 → 本issue"""
+        node = self.add_node(raw['key'], raw['fields'], source)
+        for link in raw['fields'].get('issuelinks') or []:
+            if link['id'] in self.link_ids:
+                continue
+            self.link_ids.add(link['id'])
+            type_name = link['type']['name']
+            if type_name not in self.type_index:
+                self.type_index[type_name] = len(self.type_names)
+                self.type_names.append(type_name)
+            if 'outwardIssue' in link:
+                other = link['outwardIssue']
+                edge = (node, self.add_node(other['key'], other.get('fields', {}), EMBEDDED))
+            else:
+                other = link['inwardIssue']
+                edge = (self.add_node(other['key'], other.get('fields', {}), EMBEDDED), node)
+            self.edge_sources.append(edge[0])
+            self.edge_targets.append(edge[1])
+            self.edge_types.append(self.type_index[type_name])
+
+    def adjacency(self, type_names=None, open_only=False):
+        """按起点分组的邻接数组 (offsets, targets)：节点 n 的后继为 targets[offsets[n]:offsets[n + 1]]"""
+        types = None if type_names is None else {self.type_index[name] for name in type_names
+                                                 if name in self.type_index}
+        edges = [edge for edge in range(len(self.edge_sources))
+                 if (types is None or self.edge_types[edge] in types)
+                 and not (open_only and (self.done[self.edge_sources[edge]] or self.done[self.edge_targets[edge]]))]
+        offsets = array('i', [0] * (len(self.keys) + 1))
+        for edge in edges:
+            offsets[self.edge_sources[edge] + 1] += 1
+        for node in range(len(self.keys)):
+            offsets[node + 1] += offsets[node]
+        targets = array('i', [0] * len(edges))
+        position = array('i', offsets[:-1])
+        for edge in edges:
+            source = self.edge_sources[edge]
+            targets[position[source]] = self.edge_targets[edge]
+            position[source] += 1
+        return offsets, targets
+
+def collect_links(jira, jql_query, depth=1, workers=4):
+    """拉取过滤器issue的关联，再把过滤器外的关联issue按 key in (...) 批量补全 depth 层"""
+    graph = LinkGraph()
+    for page in iter_raw_pages(jira, jql_query, fields=LINK_FIELDS):
+        for raw in page:
+            graph.add_issue(raw, FILTER)
+    PROGRESS.message(f"🔗 过滤器内 {len(graph.keys)} 个issue，{len(graph.link_ids)} 条关联")
+
+    def fetch_batch(batch):
+        return [raw for page in iter_raw_pages(jira, f'key in ({", ".join(batch)})', KEY_BATCH_SIZE, LINK_FIELDS)
+                for raw in page]
+
+    requested = set()
+    for hop in range(depth):
+        unknown = [key for node, key in enumerate(graph.keys)
+                   if graph.sources[node] == EMBEDDED and key not in requested]
+        if not unknown:
+            break
+        requested.update(unknown)
+        batches = [unknown[i:i + KEY_BATCH_SIZE] for i in range(0, len(unknown), KEY_BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # 图不是线程安全的，只在主线程中添加
+            for issues in executor.map(fetch_batch, batches):
+                for raw in issues:
+                    graph.add_issue(raw, RESOLVED)
+        PROGRESS.message(f"🔗 第 {hop + 1} 层补全 {len(unknown)} 个关联issue（{len(batches)} 次查询），"
+                         f"共 {len(graph.keys)} 个节点，{len(graph.link_ids)} 条关联")
+    missing = sum(1 for key in requested if graph.sources[graph.index[key]] == EMBEDDED)
+    if missing:
+        PROGRESS.message(f"⚠️ {missing} 个关联issue未能补全（无权限或已删除），只保留关联中的摘要和状态")
+    return graph
+
+def longest_chains(graph, type_names=DEFAULT_BLOCK_TYPES, limit=20):
+    """未完成issue之间的最长阻塞链（拓扑排序 + 动态规划），返回 (链列表, 环上节点数)
+
+    每条链为节点编号列表，按长度从长到短，只取以链末端结束的链；
+    阻塞关系成环的节点无法排序，不参与计算。
+    """
+    offsets, targets = graph.adjacency(type_names, open_only=True)
+    count = len(graph.keys)
+    in_degree = array('i', [0] * count)
+    for target in targets:
+        in_degree[target] += 1
+    length = array('i', [1] * count)
+    previous = array('i', [-1] * count)
+    queue = [node for node in range(count) if in_degree[node] == 0]
+    ordered = 0
+    while queue:
+        node = queue.pop()
+        ordered += 1
+        for target in targets[offsets[node]:offsets[node + 1]]:
+            if length[node] + 1 > length[target]:
+                length[target] = length[node] + 1
+                previous[target] = node
+            in_degree[target] -= 1
+            if in_degree[target] == 0:
+                queue.append(target)
+    ends = [node for node in range(count)
+            if offsets[node] == offsets[node + 1] and length[node] > 1 and in_degree[node] == 0]
+    ends.sort(key=lambda node: length[node], reverse=True)
+    chains = []
+    for end in ends[:limit]:
+        chain = [end]
+        while previous[chain[-1]] != -1:
+            chain.append(previous[chain[-1]])
+        chains.append(chain[::-1])
+    return chains, count - ordered
+
+def connected_components(graph):
+    """忽略方向和关联类型的连通分量（并查集），返回每个节点的分量编号，编号按分量大小从大到小"""
+    parent = array('i', range(len(graph.keys)))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for source, target in zip(graph.edge_sources, graph.edge_targets):
+        root_source, root_target = find(source), find(target)
+        if root_source != root_target:
+            parent[root_source] = root_target
+    roots = [find(node) for node in range(len(graph.keys))]
+    sizes = {}
+    for root in roots:
+        sizes[root] = sizes.get(root, 0) + 1
+    numbers = {root: number for number, root in
+               enumerate(sorted(sizes, key=lambda root: sizes[root], reverse=True), 1)}
+    return array('i', [numbers[root] for root in roots])
+
+def write_links_excel(graph, chains, components, output_file):
+    keys = graph.keys
+    workbook = xlsxwriter.Workbook(output_file, {'constant_memory': True})
+    try:
+        write_rows_to_sheet(workbook, '阻塞链', ['序号', '长度', '起点', '终点', '阻塞链'],
+                            ([number, len(chain), keys[chain[0]], keys[chain[-1]],
+                              ' → '.join(keys[node] for node in chain)] for number, chain in enumerate(chains, 1)),
+                            None)
+        stats = {}
+        for node, component in enumerate(components):
+            size, in_filter, open_count, sample = stats.get(component, (0, 0, 0, keys[node]))
+            stats[component] = (size + 1, in_filter + (graph.sources[node] == FILTER),
+                                open_count + (not graph.done[node]), sample)
+        # 单个节点（没有关联）的分量不列出
+        write_rows_to_sheet(workbook, '连通分量', ['分量', '节点数', '过滤器内', '未完成', '示例'],
+                            ([component, *stats[component]] for component in sorted(stats)
+                             if stats[component][0] > 1), None)
+        write_rows_to_sheet(workbook, '节点', ['密钥', '摘要', '状态', '来源', '分量'],
+                            ([keys[node], graph.summaries[node], graph.statuses[node],
+                              SOURCE_NAMES[graph.sources[node]], components[node]] for node in range(len(keys))), 0)
+        write_rows_to_sheet(workbook, '关联', ['密钥', '关联类型', '关联issue'],
+                            ([keys[source], graph.type_names[link_type], keys[target]] for source, target, link_type
+                             in zip(graph.edge_sources, graph.edge_targets, graph.edge_types)), 0)
+    finally:
+        workbook.close()
+
+def write_links_json(graph, chains, components, output_file):
+    """按列存放，边用节点编号表示，比逐条对象的JSON小得多"""
+    data = {
+        'nodes': {'key': graph.keys, 'summary': graph.summaries, 'status': graph.statuses,
+                  'done': list(graph.done), 'source': [SOURCE_NAMES[source] for source in graph.sources],
+                  'component': components.tolist()},
+        'types': graph.type_names,
+        'edges': {'source': graph.edge_sources.tolist(), 'target': graph.edge_targets.tolist(),
+                  'type': graph.edge_types.tolist()},
+        'chains': chains,
+    }
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+def dot_string(value):
+    return '"' + dot_escape(value) + '"'
+
+def dot_escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+def write_links_dot(graph, chains, output_file):
+    """Graphviz：已完成的issue灰色，过滤器外的虚线框，阻塞链上的边红色加粗"""
+    chain_edges = {(chain[i], chain[i + 1]) for chain in chains for i in range(len(chain) - 1)}
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write('digraph jira_links {\n  node [shape=box, fontsize=10];\n')
+        for node, key in enumerate(graph.keys):
+            summary = (graph.summaries[node] or '')[:DOT_LABEL_LENGTH]
+            style = (['filled'] if graph.done[node] else []) + (['dashed'] if graph.sources[node] != FILTER else [])
+            attrs = f'label="{dot_escape(key)}\\n{dot_escape(summary)}"'
+            if style:
+                attrs += f', style={dot_string(",".join(style))}, fillcolor=gray90'
+            f.write(f'  {dot_string(key)} [{attrs}];\n')
+        for source, target, link_type in zip(graph.edge_sources, graph.edge_targets, graph.edge_types):
+            attrs = f'label={dot_string(graph.type_names[link_type])}'
+            if (source, target) in chain_edges:
+                attrs += ', color=red, penwidth=2'
+            f.write(f'  {dot_string(graph.keys[source])} -> {dot_string(graph.keys[target])} [{attrs}];\n')
+        f.write('}\n')
+
+def export_links(jira, jql_query, output_prefix='jira_links', depth=1, type_names=DEFAULT_BLOCK_TYPES, limit=20,
+                 workers=4):
+    PROGRESS.begin()
+    try:
+        graph = collect_links(jira, jql_query, depth, workers)
+    finally:
+        PROGRESS.finish()
+    chains, cyclic = longest_chains(graph, type_names, limit)
+    components = connected_components(graph)
+    if cyclic:
+        print(f"⚠️ {cyclic} 个issue的阻塞关系成环，未计入阻塞链")
+    if chains:
+        print(f"⛓️ 最长阻塞链 {len(chains[0])} 个issue: {' → '.join(graph.keys[node] for node in chains[0])}")
+    print(f"🧩 {len(graph.keys)} 个节点，{len(graph.edge_sources)} 条关联，"
+          f"{max(components, default=0)} 个连通分量")
+    write_links_excel(graph, chains, components, output_prefix + '.xlsx')
+    write_links_json(graph, chains, components, output_prefix + '.json')
+    write_links_dot(graph, chains, output_prefix + '.dot')
+    print(f"数据已导出到: {output_prefix}.xlsx / .json / .dot")
+    return graph, chains, components
+
+if __name__ == '__main__':
+    print('MAIN_ENTRY')
+    jira = get_jira_from_config()
+    filters = get_all_filters(jira)
+    jql_query = interactive_key_selector(filters)
+    if jql_query:
+        config = load_config()
+        type_names = config.get('links', 'block_types', fallback=','.join(DEFAULT_BLOCK_TYPES))
+        export_links(jira, jql_query, 'jira_links', config.getint('links', 'depth', fallback=1),
+                     [name.strip() for name in type_names.split(',') if name.strip()],
+                     config.getint('links', 'chains', fallback=20), config.getint('export', 'workers', fallback=4))
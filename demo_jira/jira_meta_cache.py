@@ -0,0 +1,109 @@
+# JIRA 元数据磁盘缓存
+# 服务器信息、当前用户、字段列表、过滤器、项目列表等很少变化的数据按类型设置有效期(TTL)缓存到本地，
+# 同时在多次运行之间复用会话cookie，减少启动时的请求次数
+# py jira_meta_cache.py clear [类型]   清除缓存（不写类型则全部清除）
+
+import hashlib
+import json
+import os
+import sys
+import time
+
+# 缓存目录
+META_CACHE_DIR = './.jira_cache'
+
+# 各类数据的默认有效期（秒），可在 jira_config.ini 的 [cache] 段覆盖，例如 fields = 3600
+DEFAULT_TTLS = {
+    'server_info': 7 * 24 * 3600,
+    'myself': 24 * 3600,
+    'fields': 24 * 3600,
+    'filters': 3600,
+    'projects': 24 * 3600,
+    'statuses': 24 * 3600,
+    'priorities': 24 * 3600,
+    'assignees': 24 * 3600,
+    'boards': 24 * 3600,
+    # 会话cookie由服务器控制过期，本地最多保留一周
+    'cookies': 7 * 24 * 3600,
+}
+
+class MetaCache:
+    def __init__(self, directory=META_CACHE_DIR, ttls=None):
+        self.directory = directory
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.owner = ''
+
+    def set_owner(self, server, username):
+        """不同服务器/账号的缓存互相隔离"""
+        self.owner = hashlib.sha1(f'{server}|{username}'.encode('utf-8')).hexdigest()[:12]
+
+    def load_ttls(self, config):
+        """从 jira_config.ini 的 [cache] 段读取有效期设置"""
+        if config.has_section('cache'):
+            for kind, seconds in config.items('cache'):
+                self.ttls[kind] = int(seconds)
+
+    def _path(self, kind):
+        return os.path.join(self.directory, f'{self.owner}_{kind}.json')
+
+    def get(self, kind):
+        """读取未过期的缓存，没有或已过期返回None"""
+        path = self._path(kind)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry['saved_at'] > self.ttls.get(kind, 0):
+            return None
+        return entry['value']
+
+    def set(self, kind, value):
+        os.makedirs(self.directory, exist_ok=True)
+        # 先写临时文件再替换，避免中断时留下损坏的缓存
+        path = self._path(kind)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'saved_at': time.time(), 'value': value}, f, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+
+    def invalidate(self, kind=None):
+        """删除某一类（kind=None 时全部）缓存"""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            # 子目录（如已关闭sprint的永久缓存）不在此清除
+            if os.path.isdir(os.path.join(self.directory, name)):
+                continue
+            if kind is None or name.endswith(f'_{kind}.json'):
+                os.remove(os.path.join(self.directory, name))
+
+    def cached(self, kind, fetch):
+        """有缓存直接返回，否则调用 fetch() 获取并写入缓存"""
+        value = self.get(kind)
+        if value is None:
+            value = fetch()
+            self.set(kind, value)
+        return value
+
+    def load_cookies(self, session):
+        """把上次保存的cookie装入 requests 会话"""
+        cookies = self.get('cookies')
+        if cookies:
+            session.cookies.update(cookies)
+
+    def save_cookies(self, session):
+        self.set('cookies', session.cookies.get_dict())
+
+# 全局缓存实例
+META_CACHE = MetaCache()
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'clear':
+        kind = sys.argv[2] if len(sys.argv) > 2 else None
+        META_CACHE.invalidate(kind)
+        print(f"已清除缓存: {kind or '全部'}")
+    else:
+        print("用法: py jira_meta_cache.py clear "
+              "[server_info|myself|fields|filters|projects|statuses|priorities|assignees|boards|cookies]")
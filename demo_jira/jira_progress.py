@@ -0,0 +1,194 @@
+# JIRA 导出进度与耗时统计
+# 导出过程中输出结构化进度事件：已拉取页数、issues/s、接收字节数、各阶段耗时（auth/search/transform/write）、
+# 根据搜索结果 total 估算的剩余时间；显示为一行实时刷新的进度，也可追加写入 JSON Lines 指标文件
+
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+def format_seconds(seconds):
+    if seconds is None:
+        return '--:--'
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}:{minutes:02d}:{seconds:02d}' if hours else f'{minutes:02d}:{seconds:02d}'
+
+class ExportProgress:
+    def __init__(self, enabled=True, metrics_file=None, interval=0.5, stream=sys.stdout):
+        self.enabled = enabled
+        self.metrics_file = metrics_file
+        self.interval = interval
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.reset()
+        # 只在 begin() 与 finish() 之间显示进度，其余时候只计数
+        self.active = False
+        # 进度行已输出、还没有换行
+        self.line_open = False
+
+    def reset(self):
+        self.stages = defaultdict(float)
+        self.begin()
+
+    def begin(self, total=None):
+        """开始一次导出：计数、速率和阶段耗时从此刻重新计算，只保留登录（auth）耗时
+
+        同一进程依次导出多个过滤器时，各次的阶段耗时互不累计。
+        total 为预先知道的issue总数，否则取第一页搜索结果的 total。
+        """
+        with self.lock:
+            auth = self.stages.get('auth')
+            self.stages = defaultdict(float)
+            if auth is not None:
+                self.stages['auth'] = auth
+        self.started = time.perf_counter()
+        self.pages = 0
+        self.issues = 0
+        self.total = total
+        self.bytes = 0
+        self.rows = 0
+        self.last_render = 0.0
+        self.active = self.enabled
+
+    def load_config(self, config):
+        """从 jira_config.ini 的 [progress] 段读取设置"""
+        self.enabled = config.getboolean('progress', 'enabled', fallback=self.enabled)
+        self.metrics_file = config.get('progress', 'metrics_file', fallback=self.metrics_file)
+
+    @contextmanager
+    def stage(self, name):
+        """统计阶段耗时（独占时间：嵌套阶段运行时外层阶段暂停计时）"""
+        stack = self.local.__dict__.setdefault('stack', [])
+        now = time.perf_counter()
+        if stack:
+            parent, parent_start = stack[-1]
+            self._add_stage(parent, now - parent_start)
+        stack.append((name, now))
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            _, start = stack.pop()
+            self._add_stage(name, now - start)
+            if stack:
+                stack[-1] = (stack[-1][0], now)
+
+    def _add_stage(self, name, seconds):
+        with self.lock:
+            self.stages[name] += seconds
+
+    def timed_iter(self, name, iterable):
+        """逐个取值的耗时计入 name 阶段；不在导出过程中时原样返回"""
+        if not self.active:
+            return iterable
+
+        def timed():
+            iterator = iter(iterable)
+            while True:
+                with self.stage(name):
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                yield item
+        return timed()
+
+    def on_response(self, response, *args, **kwargs):
+        """requests 响应钩子：累计接收字节数（优先取 Content-Length，即压缩后的传输大小）"""
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit():
+            size = int(length)
+        else:
+            # 流式下载（附件等）不在这里读取内容
+            size = 0 if kwargs.get('stream') else len(response.content)
+        self.add_bytes(size)
+        return response
+
+    def add_bytes(self, size):
+        with self.lock:
+            self.bytes += size
+
+    def on_page(self, count, total=None):
+        """拉取到一页 count 条，total 为该搜索的结果总数（以第一次得到的为准）"""
+        with self.lock:
+            self.pages += 1
+            self.issues += count
+            if self.total is None:
+                self.total = total
+        self.emit('page', force=False)
+
+    def rows_written(self, rows, page_size=100):
+        """写入进度；不显示进度行时保持原来每页打印一次的输出"""
+        self.rows = rows
+        if self.active:
+            self.emit('write', force=False)
+        elif rows % page_size == 0:
+            print(f"已写入 {rows} 行")
+
+    def snapshot(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.issues / elapsed if elapsed > 0 else 0
+        eta = max(self.total - self.issues, 0) / rate if self.total is not None and rate > 0 else None
+        return {
+            'elapsed': round(elapsed, 3),
+            'pages': self.pages,
+            'issues': self.issues,
+            'total': self.total,
+            'rows': self.rows,
+            'issues_per_second': round(rate, 1),
+            'bytes': self.bytes,
+            'eta': round(eta, 1) if eta is not None else None,
+            'stages': {name: round(seconds, 3) for name, seconds in self.stages.items()},
+        }
+
+    def emit(self, event, force=True, **fields):
+        """输出一个进度事件：刷新进度行（按 interval 节流）并写入指标文件"""
+        if not self.active:
+            return
+        now = time.perf_counter()
+        if not force and now - self.last_render < self.interval:
+            return
+        self.last_render = now
+        data = self.snapshot()
+        total = data['total'] if data['total'] is not None else '?'
+        line = (f"\r📥 {data['pages']} 页 | {data['issues']}/{total} 条 | 已写 {data['rows']} 行 | "
+                f"{data['issues_per_second']:,.0f} 条/s | {data['bytes'] / 1024 / 1024:.1f} MB | "
+                f"剩余 {format_seconds(data['eta'])}")
+        self.stream.write(line.ljust(100))
+        self.stream.flush()
+        self.line_open = True
+        if self.metrics_file:
+            with open(self.metrics_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(dict(data, event=event, time=time.time(), **fields), ensure_ascii=False) + '\n')
+
+    def end_line(self):
+        """进度行后面还没有换行时补一个换行，之后的输出不会覆盖进度行"""
+        if self.line_open:
+            self.stream.write("\n")
+            self.stream.flush()
+            self.line_open = False
+
+    def message(self, text):
+        """导出过程中输出一行消息（警告等）：先结束进度行，再打印"""
+        self.end_line()
+        print(text)
+
+    def finish(self):
+        """结束：输出最终进度和各阶段耗时"""
+        if not self.active:
+            return
+        self.emit('finish')
+        self.end_line()
+        self.active = False
+        stages = ', '.join(f'{name} {seconds:.1f}s' for name, seconds in sorted(self.stages.items(),
+                                                                                key=lambda item: -item[1]))
+        if stages:
+            self.stream.write(f"⏱️ 各阶段耗时: {stages}\n")
+            self.stream.flush()
+
+# 全局进度统计，同一进程内的导出共享
+PROGRESS = ExportProgress()
@@ -0,0 +1,192 @@
+# JIRA 看板 / Sprint 导出
+# 列出 FERA、ER23282 项目的 scrum 看板及其全部sprint，各sprint的issue并发拉取（JQL: sprint = id），输出 jira_sprints.xlsx：
+#   - Sprint汇总：每个sprint的状态、起止日期、issue数、完成数、承诺/完成故事点（速率）
+#     已关闭的sprint按解决时间不晚于sprint完成时间判断完成（之后的sprint中才完成的不计入，避免速率重复统计）
+#   - Sprint issues：与issue导出相同的列，前面加 看板 / Sprint 两列，后面加故事点、是否完成、解决时间（燃尽图输入）
+# 已关闭的sprint内容不会再变化，永久缓存在 .jira_cache/sprints/，之后只拉取进行中和未开始的sprint
+# pip install jira xlsxwriter
+# py jira_sprints.py
+
+# DOC REF
+# https://developer.atlassian.com/cloud/jira/software/rest/api-group-board/#api-rest-agile-1-0-board-get
+# https://developer.atlassian.com/cloud/jira/software/rest/api-group-board/#api-rest-agile-1-0-board-boardid-sprint-get
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import xlsxwriter
+
+from jira_meta_cache import META_CACHE
+from jira_sync import columns_signature, REST_TIME_FORMAT
+from test_jira import (load_config, get_jira_from_config, resolve_columns, load_field_index, projection_fields,
+                       key_column, iter_raw_pages, extract_columns, write_rows_to_sheet)
+from jira_progress import PROGRESS
+
+# get_jira_projects 中关注的两个项目
+SPRINT_PROJECTS = ['FERA', 'ER23282']
+DEFAULT_POINTS_FIELD = 'Story Points'
+SPRINT_CACHE_DIR = os.path.join(META_CACHE.directory, 'sprints')
+# 缓存内容的版本：完成的判断方式变化后旧缓存不再使用
+SPRINT_CACHE_VERSION = 2
+SUMMARY_HEADERS = ['看板', 'Sprint', '状态', '开始', '结束', '完成时间', 'issue数', '完成数', '承诺故事点', '完成故事点']
+
+def get_boards(jira, project_keys):
+    """项目的 scrum 看板（kanban 看板没有sprint），按项目缓存"""
+    cached = META_CACHE.get('boards') or {}
+    missing = [key for key in project_keys if key not in cached]
+    if missing:
+        for key in missing:
+            cached[key] = [board.raw for board in jira.boards(projectKeyOrID=key, maxResults=False)]
+        META_CACHE.set('boards', cached)
+    # 一个看板可能同时属于多个项目
+    boards = {board['id']: board for key in project_keys for board in cached[key] if board.get('type') == 'scrum'}
+    return list(boards.values())
+
+def get_sprints(jira, board_id):
+    return [sprint.raw for sprint in jira.sprints(board_id, maxResults=False)]
+
+def sprint_cache_path(sprint_id, signature):
+    return os.path.join(SPRINT_CACHE_DIR, f'{META_CACHE.owner}_{sprint_id}_{signature}_v{SPRINT_CACHE_VERSION}.json')
+
+def load_closed_sprint(sprint_id, signature):
+    path = sprint_cache_path(sprint_id, signature)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return None
+
+def save_closed_sprint(sprint_id, signature, data):
+    os.makedirs(SPRINT_CACHE_DIR, exist_ok=True)
+    path = sprint_cache_path(sprint_id, signature)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+
+def parse_rest_time(value):
+    """REST 时间（issue 的 +0800 偏移或 agile 接口的 Z 结尾）转为带时区的时间，为空返回None"""
+    return datetime.strptime(value, REST_TIME_FORMAT) if value else None
+
+def completed_in_sprint(values, complete_date):
+    """issue是否在该sprint内完成
+
+    进行中的sprint看当前状态；已关闭的sprint要求解决时间不晚于sprint完成时间，
+    延续到之后的sprint才完成的issue当前状态也是完成，按状态判断会在两个sprint中重复计入速率。
+    """
+    if complete_date is None:
+        return values['status']['statusCategory']['key'] == 'done'
+    resolved = parse_rest_time(values.get('resolutiondate'))
+    return resolved is not None and resolved <= complete_date
+
+def fetch_sprint(jira, sprint, columns, points_field=None):
+    """拉取一个sprint的issue：导出列的行数据，以及每个issue的故事点、是否在该sprint内完成、解决时间"""
+    sprint_id = sprint['id']
+    complete_date = parse_rest_time(sprint.get('completeDate')) if sprint['state'] == 'closed' else None
+    fields = ','.join(filter(None, [projection_fields(columns), 'status', 'resolutiondate', points_field]))
+    data = {'rows': [], 'points': [], 'done': [], 'resolved': []}
+    for page in iter_raw_pages(jira, f'sprint = {sprint_id}', fields=fields):
+        data['rows'].extend(list(row) for row in zip(*extract_columns(page, columns).values()))
+        for raw in page:
+            values = raw['fields']
+            data['points'].append(values.get(points_field) if points_field else None)
+            data['done'].append(completed_in_sprint(values, complete_date))
+            data['resolved'].append(values.get('resolutiondate'))
+    return data
+
+def sprint_summary(board, sprint, data):
+    points = [point or 0 for point in data['points']]
+    return [board['name'], sprint['name'], sprint['state'], sprint.get('startDate'), sprint.get('endDate'),
+            sprint.get('completeDate'), len(data['rows']), sum(data['done']), sum(points),
+            sum(point for point, done in zip(points, data['done']) if done)]
+
+def export_sprints(jira, output_file, columns, project_keys=SPRINT_PROJECTS, points_name=DEFAULT_POINTS_FIELD,
+                   workers=4):
+    """导出看板的全部sprint，返回 [(看板, sprint, 数据)]"""
+    index = load_field_index(jira)
+    if points_name not in index:
+        index = load_field_index(jira, refresh=True)
+    points_field = index.get(points_name)
+    if points_field is None:
+        print(f"⚠️ 未找到故事点字段: {points_name}，速率按0统计")
+    signature = hashlib.sha1(columns_signature(columns).encode('utf-8')).hexdigest()[:10]
+
+    boards = get_boards(jira, project_keys)
+    try:
+        return write_sprints(jira, output_file, columns, boards, signature, points_field, workers)
+    finally:
+        PROGRESS.finish()
+
+def count_sprint_issues(jira, sprint_ids):
+    """待拉取sprint的issue总数（maxResults=0 只取 total），用于进度显示"""
+    if not sprint_ids:
+        return 0
+    jql_query = f"sprint in ({', '.join(str(sprint_id) for sprint_id in sprint_ids)})"
+    return jira._get_json('search', params={'jql': jql_query, 'maxResults': 0, 'fields': 'key'})['total']
+
+def write_sprints(jira, output_file, columns, boards, signature, points_field, workers):
+    """列出各看板的sprint，已关闭的读缓存、其余并发拉取，写出汇总和issue两个工作表"""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        sprints = [(board, sprint) for board, board_sprints in zip(boards, executor.map(
+            lambda board: get_sprints(jira, board['id']), boards)) for sprint in board_sprints]
+
+        # 已关闭的sprint直接读缓存，其余并发拉取
+        results = {}
+        pending = {}
+        for board, sprint in sprints:
+            cached = load_closed_sprint(sprint['id'], signature) if sprint['state'] == 'closed' else None
+            if cached is not None:
+                results[sprint['id']] = cached
+            else:
+                pending.setdefault(sprint['id'], sprint)
+        print(f"📋 {len(boards)} 个看板，{len(sprints)} 个sprint（缓存 {len(results)} 个，拉取 {len(pending)} 个）")
+        # 各sprint搜索的 total 只是单个sprint的数量，总数单独查询
+        PROGRESS.begin(count_sprint_issues(jira, pending))
+        futures = {sprint_id: executor.submit(fetch_sprint, jira, sprint, columns, points_field)
+                   for sprint_id, sprint in pending.items()}
+        for board, sprint in sprints:
+            if sprint['id'] not in results:
+                results[sprint['id']] = futures[sprint['id']].result()
+                if sprint['state'] == 'closed':
+                    save_closed_sprint(sprint['id'], signature, results[sprint['id']])
+
+    headers = ['看板', 'Sprint'] + [header for header, _, _, _ in columns] + ['故事点', '已完成', '解决时间']
+    key_col = key_column(columns)
+    workbook = xlsxwriter.Workbook(output_file, {'constant_memory': True})
+    try:
+        summary = workbook.add_worksheet('Sprint汇总')
+        summary.set_column('A:B', 24)
+        summary.set_column('D:F', 26)
+        summary.write_row(0, 0, SUMMARY_HEADERS)
+        for row, (board, sprint) in enumerate(sprints, 1):
+            summary.write_row(row, 0, sprint_summary(board, sprint, results[sprint['id']]))
+
+        def rows():
+            for board, sprint in sprints:
+                data = results[sprint['id']]
+                for values, points, done, resolved in zip(data['rows'], data['points'], data['done'],
+                                                          data['resolved']):
+                    yield [board['name'], sprint['name']] + values + [points, '是' if done else '否', resolved]
+        write_rows_to_sheet(workbook, 'Sprint issues', headers, rows(), key_col + 2 if key_col is not None else None)
+    finally:
+        workbook.close()
+
+    # 各看板已关闭sprint的平均速率
+    for board in boards:
+        closed = [sprint_summary(board, sprint, results[sprint['id']])[-1] for sprint_board, sprint in sprints
+                  if sprint_board is board and sprint['state'] == 'closed']
+        if closed:
+            PROGRESS.message(f"🏃 {board['name']}: {len(closed)} 个已关闭sprint，平均速率 {sum(closed) / len(closed):.1f} 点")
+    PROGRESS.message(f"数据已导出到: {output_file}")
+    return [(board, sprint, results[sprint['id']]) for board, sprint in sprints]
+
+if __name__ == '__main__':
+    print('MAIN_ENTRY')
+    jira = get_jira_from_config()
+    config = load_config()
+    projects = config.get('sprints', 'projects', fallback=','.join(SPRINT_PROJECTS))
+    export_sprints(jira, "jira_sprints.xlsx", resolve_columns(jira),
+                   [key.strip() for key in projects.split(',') if key.strip()],
+                   config.get('sprints', 'points_field', fallback=DEFAULT_POINTS_FIELD),
+                   config.getint('export', 'workers', fallback=4))
@@ -0,0 +1,175 @@
+# JIRA 过滤器计数汇总（只取总数，不下载issue）
+# 按状态、优先级、经办人等分组，每个分组值构造一条 maxResults=0 的JQL，只读取响应中的 total；
+# 各查询并发执行（经 jira_governor 调度），结果汇总为透视表。10万条的过滤器也只需几十个很小的请求
+# pip install jira pandas xlsxwriter
+# py jira_summary.py                    按 [summary] groups 分组（默认 status, priority, assignee）
+# py jira_summary.py status assignee    另外输出 状态 × 经办人 透视表（两个分组时）
+
+# DOC REF
+# https://developer.atlassian.com/cloud/jira/platform/rest/v2/api-group-issue-search/#api-rest-api-2-search-get
+# https://developer.atlassian.com/cloud/jira/platform/rest/v2/api-group-user-search/#api-rest-api-2-user-assignable-multiprojectsearch-get
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from jira_governor import GOVERNOR
+from jira_meta_cache import META_CACHE
+from test_jira import load_config, get_jira_from_config, get_all_filters, interactive_key_selector, strip_order_by
+
+DEFAULT_GROUPS = ['status', 'priority', 'assignee']
+# 分组列名
+GROUP_NAMES = {'status': '状态', 'priority': '优先级', 'assignee': '经办人'}
+# 分组值没有覆盖到的issue（如已停用的经办人）
+OTHER_LABEL = '其他'
+
+def count_issues(jira, jql_query):
+    """只取查询结果总数：maxResults=0，不返回任何issue
+
+    search_issues(maxResults=0) 会被当作“拉取全部”，这里直接调用 search 接口。
+    """
+    return jira._get_json('search', params={'jql': jql_query, 'maxResults': 0, 'fields': 'key'})['total']
+
+def jql_string(value):
+    """JQL字符串字面量（加引号并转义）"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def restrict(jql_query, *clauses):
+    """在过滤器JQL上追加条件（排序对计数无意义，去掉）"""
+    base = strip_order_by(jql_query)
+    parts = ([f'({base})'] if base else []) + list(clauses)
+    return ' AND '.join(parts)
+
+def assignable_users(jira, config):
+    """可分配用户列表：[summary] projects 配置的项目，没有配置时取全部项目"""
+    keys = config.get('summary', 'projects', fallback='')
+    if not keys:
+        projects = META_CACHE.cached('projects', lambda: [project.raw for project in jira.projects()])
+        keys = ','.join(project['key'] for project in projects)
+    keys = ','.join(key.strip() for key in keys.split(',') if key.strip())
+
+    cached = META_CACHE.get('assignees')
+    if cached and cached['projects'] == keys:
+        return cached['users']
+    params = {'projectKeys': keys, 'maxResults': 1000}
+    # Server / Data Center 版本要求 username 参数，Cloud 已弃用
+    if jira.deploymentType != 'Cloud':
+        params['username'] = ''
+    users = jira._get_json('user/assignable/multiProjectSearch', params=params)
+    META_CACHE.set('assignees', {'projects': keys, 'users': users})
+    return users
+
+def group_values(jira, group, config):
+    """分组的全部取值，返回 [(显示名, JQL条件)]
+
+    status / priority / assignee 从服务器元数据获取（走元数据缓存），
+    其他字段在 [summary] 段用 <字段>_values 逗号分隔列出取值，
+    如 "Issue Severity_values = S1-Blocker, S2-Critical"。
+    """
+    values = config.get('summary', f'{group}_values', fallback='')
+    if values:
+        field = jql_string(group) if ' ' in group else group
+        values = [value.strip() for value in values.split(',') if value.strip()]
+        return [(value, f'{field} = {jql_string(value)}') for value in values]
+    if group == 'status':
+        statuses = META_CACHE.cached('statuses', lambda: jira._get_json('status'))
+        # 不同项目的工作流可能有同名状态
+        names = dict.fromkeys(status['name'] for status in statuses)
+        return [(name, f'status = {jql_string(name)}') for name in names]
+    if group == 'priority':
+        priorities = META_CACHE.cached('priorities', lambda: jira._get_json('priority'))
+        names = [priority['name'] for priority in priorities]
+        return [(name, f'priority = {jql_string(name)}') for name in names] + [('无', 'priority is EMPTY')]
+    if group == 'assignee':
+        values = []
+        for user in assignable_users(jira, config):
+            user_id = user.get('accountId', user.get('name'))
+            # 显示名重复时附上用户id区分
+            label = user['displayName']
+            if any(label == existing for existing, _ in values):
+                label = f'{label} ({user_id})'
+            values.append((label, f'assignee = {jql_string(user_id)}'))
+        return values + [('未分配', 'assignee is EMPTY')]
+    raise ValueError(f"未配置分组取值: {group}（在 [summary] 段添加 {group}_values）")
+
+def count_all(jira, queries, workers=8):
+    """并发计数，queries 为JQL列表，返回对应的总数列表"""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda jql: count_issues(jira, jql), queries))
+
+def group_counts(jira, jql_query, group, values, total, workers=8):
+    """单个分组的计数表（只保留非0的取值，覆盖不到的计入“其他”）"""
+    counts = count_all(jira, [restrict(jql_query, clause) for _, clause in values], workers)
+    rows = [(label, count) for (label, _), count in zip(values, counts) if count]
+    other = total - sum(count for _, count in rows)
+    if other > 0:
+        rows.append((OTHER_LABEL, other))
+    df = pd.DataFrame(rows, columns=[GROUP_NAMES.get(group, group), 'issue数'])
+    df.sort_values('issue数', ascending=False, inplace=True, ignore_index=True)
+    df['占比'] = (df['issue数'] / total * 100).round(1) if total else 0.0
+    return df
+
+def pivot_counts(jira, jql_query, row_group, col_group, row_values, col_values, row_totals, workers=8):
+    """两个分组的交叉计数透视表，只对各自非0的取值组合发请求"""
+    cells = [(row_label, col_label, restrict(jql_query, row_clause, col_clause))
+             for row_label, row_clause in row_values for col_label, col_clause in col_values]
+    counts = count_all(jira, [jql for _, _, jql in cells], workers)
+    df = pd.DataFrame([(row_label, col_label, count) for (row_label, col_label, _), count in zip(cells, counts)],
+                      columns=['row', 'col', 'count'])
+    pivot = df.pivot(index='row', columns='col', values='count')
+    # 保持取值顺序（按数量从大到小）
+    pivot = pivot.reindex(index=[label for label, _ in row_values], columns=[label for label, _ in col_values])
+    pivot['合计'] = [row_totals[label] for label in pivot.index]
+    pivot.loc['合计'] = pivot.sum()
+    pivot.index.name = GROUP_NAMES.get(row_group, row_group)
+    pivot.columns.name = GROUP_NAMES.get(col_group, col_group)
+    return pivot
+
+def summarize(jira, jql_query, groups, config, workers=8):
+    """返回 (总数, {工作表名: DataFrame})"""
+    total = count_issues(jira, jql_query)
+    tables = {}
+    nonzero = {}
+    for group in groups:
+        values = group_values(jira, group, config)
+        df = group_counts(jira, jql_query, group, values, total, workers)
+        tables[GROUP_NAMES.get(group, group)] = df
+        clauses = dict(values)
+        label_column = df.columns[0]
+        nonzero[group] = ([(label, clauses[label]) for label in df[label_column] if label in clauses],
+                          dict(zip(df[label_column], df['issue数'])))
+    if len(groups) == 2:
+        row_group, col_group = groups
+        (row_values, row_totals), (col_values, _) = nonzero[row_group], nonzero[col_group]
+        pivot = pivot_counts(jira, jql_query, row_group, col_group, row_values, col_values, row_totals, workers)
+        tables[f'{pivot.index.name}×{pivot.columns.name}'] = pivot
+    return total, tables
+
+def has_labels(df):
+    """透视表的行索引是分组取值，需要输出；计数表的行索引只是序号"""
+    return df.index.name is not None
+
+def write_summary(tables, output_file):
+    with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
+        for sheet_name, df in tables.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=has_labels(df))
+    print(f"汇总已导出到: {output_file}")
+
+if __name__ == '__main__':
+    print('MAIN_ENTRY')
+    jira = get_jira_from_config()
+    filters = get_all_filters(jira)
+    jql_query = interactive_key_selector(filters)
+    if jql_query:
+        config = load_config()
+        groups = sys.argv[1:] or [group.strip() for group in
+                                  config.get('summary', 'groups', fallback=','.join(DEFAULT_GROUPS)).split(',')]
+        start = time.perf_counter()
+        total, tables = summarize(jira, jql_query, groups, config, config.getint('export', 'workers', fallback=8))
+        print(f"\n📊 过滤器共 {total} 条（{time.perf_counter() - start:.1f}s）")
+        for name, df in tables.items():
+            print(f"\n{df.to_string(index=has_labels(df))}")
+        write_summary(tables, "jira_summary.xlsx")
+        GOVERNOR.report()
@@ -0,0 +1,144 @@
+# JIRA 增量同步
+# 首次运行全量拉取过滤器结果并写入本地 SQLite 缓存，之后只拉取 updated 晚于上次同步的issue，
+# 再从缓存生成Excel
+# pip install jira xlsxwriter
+
+# DOC REF
+# https://docs.python.org/zh-cn/3/library/sqlite3.html
+# https://support.atlassian.com/jira-software-cloud/docs/jql-fields/#Updated
+
+import json
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+from test_jira import (get_jira_from_config, get_all_filters, interactive_key_selector, resolve_columns,
+                       projection_fields, issue_to_row, cell_value, key_column, issue_key_sort,
+                       iter_issue_pages, strip_order_by, write_rows_to_excel_stream, jql_datetime)
+
+# 本地缓存数据库
+CACHE_DB = './jira_cache.db'
+# 增量查询时间向前多取一段：JQL只精确到分钟，且JIRA搜索索引的更新有延迟
+SYNC_OVERLAP = timedelta(minutes=10)
+JQL_TIME_FORMAT = '%Y-%m-%d %H:%M'
+# REST 返回的时间格式（带时区偏移）
+REST_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f%z'
+
+def open_cache(path=CACHE_DB):
+    """打开（必要时创建）本地issue缓存"""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS issues (
+            key TEXT PRIMARY KEY,
+            updated TEXT,
+            row TEXT
+        );
+        CREATE TABLE IF NOT EXISTS filter_issues (
+            jql TEXT,
+            key TEXT,
+            PRIMARY KEY (jql, key)
+        );
+        CREATE TABLE IF NOT EXISTS sync_state (
+            jql TEXT PRIMARY KEY,
+            last_sync TEXT,  -- 已同步的issue中最大的 updated（服务器时间）
+            columns TEXT
+        );
+    """)
+    return conn
+
+def columns_signature(columns):
+    """列配置签名，列配置变化后缓存中的行需要全量重建"""
+    return json.dumps([[header, field_id, list(attrs), default] for header, field_id, attrs, default in columns],
+                      ensure_ascii=False)
+
+def parse_watermark(value):
+    """解析 REST 返回的时间；为空或旧版本记录的本机时间（无时区）返回None，需要全量同步"""
+    try:
+        return datetime.strptime(value, REST_TIME_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+def sync_filter(jira, conn, jql_query, columns, full=False, page_size=100):
+    """同步一个过滤器到本地缓存，返回本次写入的issue数量
+
+    同步水位取已同步issue中最大的 updated（JIRA服务器的时间），不用本机时间：
+    JQL中的时间按当前用户在JIRA中设置的时区解释，本机时区不同时会漏掉issue。
+    """
+    signature = columns_signature(columns)
+    state = conn.execute('SELECT last_sync, columns FROM sync_state WHERE jql = ?', (jql_query,)).fetchone()
+    base = strip_order_by(jql_query)
+    watermark = parse_watermark(state[0]) if state else None
+
+    if full or state is None or state[1] != signature or watermark is None:
+        print("🔄 全量同步")
+        conn.execute('DELETE FROM filter_issues WHERE jql = ?', (jql_query,))
+        query = jql_query
+        watermark = None
+    else:
+        since = (datetime.strptime(jql_datetime(jira, state[0]), JQL_TIME_FORMAT) - SYNC_OVERLAP
+                 ).strftime(JQL_TIME_FORMAT)
+        print(f"🔄 增量同步（updated >= {since}）")
+        query = f'({base}) AND updated >= "{since}"' if base else f'updated >= "{since}"'
+        if base:
+            # 上次同步后被修改且已不再满足过滤条件的issue（如已关闭），从该过滤器中移除
+            left = f'NOT ({base}) AND updated >= "{since}"'
+            left_keys = [(jql_query, issue.key)
+                         for page in iter_issue_pages(jira, left, page_size, 'key') for issue in page]
+            conn.executemany('DELETE FROM filter_issues WHERE jql = ? AND key = ?', left_keys)
+
+    fields = ','.join(filter(None, [projection_fields(columns), 'updated']))
+    count = 0
+    for page in iter_issue_pages(jira, query, page_size, fields):
+        rows = []
+        for issue in page:
+            values = [cell_value(value) for value in issue_to_row(issue, columns).values()]
+            rows.append((issue.key, issue.fields.updated, json.dumps(values, ensure_ascii=False)))
+            updated = parse_watermark(issue.fields.updated)
+            if updated is not None and (watermark is None or updated > watermark):
+                watermark = updated
+        conn.executemany(
+            'INSERT INTO issues (key, updated, row) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET updated = excluded.updated, row = excluded.row',
+            rows)
+        conn.executemany('INSERT OR IGNORE INTO filter_issues (jql, key) VALUES (?, ?)',
+                         [(jql_query, key) for key, _, _ in rows])
+        conn.commit()
+        count += len(rows)
+        print(f"已同步 {count} 条")
+
+    conn.execute('INSERT OR REPLACE INTO sync_state (jql, last_sync, columns) VALUES (?, ?, ?)',
+                 (jql_query, watermark.strftime(REST_TIME_FORMAT) if watermark else None, signature))
+    conn.commit()
+    return count
+
+def iter_cached_rows(conn, jql_query):
+    """按key顺序读取某个过滤器缓存的行"""
+    cached = conn.execute(
+        'SELECT i.key, i.row FROM filter_issues f JOIN issues i ON i.key = f.key WHERE f.jql = ?',
+        (jql_query,)).fetchall()
+    cached.sort(key=lambda item: issue_key_sort(item[0]))
+    for _, row in cached:
+        yield json.loads(row)
+
+def export_from_cache(conn, jql_query, columns, output_file):
+    """从本地缓存生成Excel"""
+    headers = [header for header, _, _, _ in columns]
+    row = write_rows_to_excel_stream(headers, iter_cached_rows(conn, jql_query), output_file, key_column(columns))
+    print(f"数据已导出到: {output_file}（共 {row} 行）")
+    return row
+
+if __name__ == '__main__':
+    print('MAIN_ENTRY')
+    # py jira_sync.py --full 强制全量同步
+    full = '--full' in sys.argv
+    jira = get_jira_from_config()
+    filters = get_all_filters(jira)
+    jql_query = interactive_key_selector(filters)
+    if jql_query:
+        columns = resolve_columns(jira)
+        conn = open_cache()
+        try:
+            sync_filter(jira, conn, jql_query, columns, full)
+            export_from_cache(conn, jql_query, columns, "jira_issues.xlsx")
+        finally:
+            conn.close()
@@ -0,0 +1,189 @@
+# 合成JIRA issue数据（与 /rest/api/2/search 返回的 issue JSON 结构一致）
+# 用于离线基准测试，不需要访问JIRA服务器
+
+import random
+from datetime import datetime, timedelta
+
+SERVER = 'https://nothingtech.atlassian.net'
+PROJECTS = ['FERA', 'ER23282']
+ISSUE_TYPES = ['Bug', 'Task', 'Story']
+STATUSES = ['Open', 'NEW', 'In Progress', 'ReOpen', 'NEED MORE INFO', 'Resolved', 'Closed']
+PRIORITIES = ['Highest', 'High', 'Medium', 'Low']
+SEVERITIES = ['S1-Blocker', 'S2-Critical', 'S3-Major', 'S4-Minor']
+REPRODUCE_RATES = ['100%', '50%', '10%', '1%']
+USERS = [f'user{i:02d}' for i in range(20)]
+DONE_STATUSES = ['Resolved', 'Closed']
+STORY_POINTS = [1, 2, 3, 5, 8]
+# 每个项目一个scrum看板，每个看板的sprint：前面的已关闭，倒数第二个进行中，最后一个未开始
+SPRINTS_PER_BOARD = 10
+SPRINT_DAYS = 14
+# issue关联：同一项目内相邻issue组成阻塞链（每5个断开一次），每50个issue关联一个另一项目的issue
+BLOCK_STEP = len(PROJECTS)
+BLOCK_CHAIN_BREAK = 5
+RELATES_EVERY = 50
+
+def make_user(name, server=SERVER):
+    return {
+        'self': f'{server}/rest/api/2/user?accountId={name}',
+        'accountId': name,
+        'displayName': name.capitalize(),
+        'emailAddress': f'{name}@example.com',
+        'active': True,
+        'timeZone': 'Asia/Shanghai',
+    }
+
+def make_option(value, option_id, server=SERVER):
+    return {'self': f'{server}/rest/api/2/customFieldOption/{option_id}', 'value': value, 'id': str(option_id)}
+
+def make_attachment(index, number, rng, server=SERVER):
+    # 同一份内容会被多个issue引用（日志模板、截图等），attachment_content 按 content_id 生成内容
+    content_id = rng.randint(0, 49)
+    attachment_id = 50000 + index * 10 + number
+    return {
+        'self': f'{server}/rest/api/2/attachment/{attachment_id}',
+        'id': str(attachment_id),
+        'filename': f'log_{content_id}.txt',
+        'size': len(attachment_content(content_id)),
+        'mimeType': 'text/plain',
+        'content': f'{server}/rest/api/2/attachment/content/{attachment_id}?content_id={content_id}',
+    }
+
+def attachment_content(content_id):
+    """合成附件内容（按 content_id 固定）"""
+    return (f'synthetic attachment {content_id}\n' * (200 + content_id * 50)).encode('utf-8')
+
+def board_id(project_number):
+    return 1 + project_number
+
+def sprint_id(index):
+    """第 index 个issue所在的sprint（issue按项目轮流分配，同一项目内按序号轮流分到各sprint）"""
+    project_number = index % len(PROJECTS)
+    return 1000 + project_number * 100 + (index // len(PROJECTS)) % SPRINTS_PER_BOARD
+
+def make_board(project_number, server=SERVER):
+    board = board_id(project_number)
+    project = PROJECTS[project_number]
+    return {'id': board, 'self': f'{server}/rest/agile/1.0/board/{board}', 'name': f'{project} board',
+            'type': 'scrum', 'location': {'projectKey': project}}
+
+def make_sprint(project_number, number, server=SERVER):
+    """看板的第 number 个sprint（与 /rest/agile/1.0/board/{id}/sprint 的结构一致）"""
+    sprint = 1000 + project_number * 100 + number
+    start = datetime(2025, 1, 1) + timedelta(days=SPRINT_DAYS * number)
+    end = start + timedelta(days=SPRINT_DAYS)
+    state = 'closed' if number < SPRINTS_PER_BOARD - 2 else 'active' if number == SPRINTS_PER_BOARD - 2 else 'future'
+    raw = {'id': sprint, 'self': f'{server}/rest/agile/1.0/sprint/{sprint}', 'state': state,
+           'name': f'{PROJECTS[project_number]} Sprint {number + 1}', 'originBoardId': board_id(project_number)}
+    if state != 'future':
+        raw['startDate'] = start.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        raw['endDate'] = end.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    if state == 'closed':
+        raw['completeDate'] = raw['endDate']
+    return raw
+
+def issue_rng(index, seed=0):
+    """每个issue独立的随机数发生器，可按序号单独生成任意issue"""
+    return random.Random(seed * 1000003 + index)
+
+def make_status(status, server=SERVER):
+    return {'self': f'{server}/rest/api/2/status/1', 'name': status, 'id': str(STATUSES.index(status)),
+            'statusCategory': ({'id': 3, 'key': 'done', 'colorName': 'green', 'name': 'Done'}
+                               if status in DONE_STATUSES else
+                               {'id': 2, 'key': 'new', 'colorName': 'blue-gray', 'name': 'To Do'})}
+
+def issue_status(index, seed=0):
+    """第 index 个issue的状态（与 make_raw_issue 的随机序列一致，不生成整个issue）"""
+    rng = issue_rng(index, seed)
+    rng.randint(0, 2000)
+    rng.choice(USERS)
+    rng.choice(ISSUE_TYPES)
+    return rng.choice(STATUSES)
+
+def issue_key(index):
+    return f'{PROJECTS[index % len(PROJECTS)]}-{index + 1}'
+
+def make_linked_issue(index, seed=0, server=SERVER):
+    """issuelinks 中内嵌的对方issue（只有 summary/status 等少量字段）"""
+    return {'id': str(10000 + index), 'key': issue_key(index), 'self': f'{server}/rest/api/2/issue/{10000 + index}',
+            'fields': {'summary': f'[{PROJECTS[index % len(PROJECTS)]}] synthetic issue {index}',
+                       'status': make_status(issue_status(index, seed), server)}}
+
+def make_issue_links(index, seed=0, server=SERVER):
+    """第 index 个issue的关联（两端的issue都会列出同一条关联，方向相反）"""
+    blocks = {'id': '10000', 'name': 'Blocks', 'inward': 'is blocked by', 'outward': 'blocks'}
+    relates = {'id': '10003', 'name': 'Relates', 'inward': 'relates to', 'outward': 'relates to'}
+    links = []
+    if index % BLOCK_CHAIN_BREAK != BLOCK_CHAIN_BREAK - 1:
+        links.append({'id': str(20000 + index * 2), 'type': blocks,
+                      'outwardIssue': make_linked_issue(index + BLOCK_STEP, seed, server)})
+    if index >= BLOCK_STEP and (index - BLOCK_STEP) % BLOCK_CHAIN_BREAK != BLOCK_CHAIN_BREAK - 1:
+        links.append({'id': str(20000 + (index - BLOCK_STEP) * 2), 'type': blocks,
+                      'inwardIssue': make_linked_issue(index - BLOCK_STEP, seed, server)})
+    if index % RELATES_EVERY == 0:
+        links.append({'id': str(20001 + index * 2), 'type': relates,
+                      'outwardIssue': make_linked_issue(index + 1, seed, server)})
+    if index % RELATES_EVERY == 1:
+        links.append({'id': str(20001 + (index - 1) * 2), 'type': relates,
+                      'inwardIssue': make_linked_issue(index - 1, seed, server)})
+    return links
+
+def make_raw_issue(index, seed=0, server=SERVER):
+    """生成第 index 个合成issue"""
+    rng = issue_rng(index, seed)
+    project = PROJECTS[index % len(PROJECTS)]
+    created = datetime(2025, 1, 1) + timedelta(minutes=index * 7)
+    updated = created + timedelta(hours=rng.randint(0, 2000))
+    assignee = rng.choice(USERS)
+    issue_type = rng.choice(ISSUE_TYPES)
+    status = rng.choice(STATUSES)
+    priority = rng.choice(PRIORITIES)
+    return {
+        'expand': 'operations,versionedRepresentations,editmeta,changelog,renderedFields',
+        'id': str(10000 + index),
+        'self': f'{server}/rest/api/2/issue/{10000 + index}',
+        'key': issue_key(index),
+        'fields': {
+            'issuetype': {'self': f'{server}/rest/api/2/issuetype/1', 'id': '1', 'name': issue_type,
+                          'subtask': False, 'iconUrl': f'{server}/images/icons/{issue_type.lower()}.svg'},
+            'summary': f'[{project}] synthetic issue {index} ' + 'x' * rng.randint(10, 80),
+            'assignee': make_user(assignee, server) if rng.random() > 0.1 else None,
+            'reporter': make_user(rng.choice(USERS), server),
+            'status': make_status(status, server),
+            'created': created.strftime('%Y-%m-%dT%H:%M:%S.000+0800'),
+            'updated': updated.strftime('%Y-%m-%dT%H:%M:%S.000+0800'),
+            'resolutiondate': updated.strftime('%Y-%m-%dT%H:%M:%S.000+0800') if status in DONE_STATUSES else None,
+            'priority': {'self': f'{server}/rest/api/2/priority/3', 'name': priority,
+                         'id': str(PRIORITIES.index(priority))},
+            'customfield_10041': make_option(rng.choice(SEVERITIES), 10100, server),
+            'customfield_10030': make_option(rng.choice(REPRODUCE_RATES), 10200, server),
+            # Story Points（不占用随机序列，其他字段的取值保持不变）
+            'customfield_10016': float(STORY_POINTS[index // len(PROJECTS) // SPRINTS_PER_BOARD % len(STORY_POINTS)]),
+            'attachment': [make_attachment(index, number, rng, server) for number in range(rng.randint(0, 2))],
+            'issuelinks': make_issue_links(index, seed, server),
+        },
+    }
+
+def make_raw_issues(count, seed=0, server=SERVER):
+    """生成 count 个合成issue（固定随机种子，结果可复现）"""
+    return [make_raw_issue(index, seed, server) for index in range(count)]
+
+def make_changelog(index, seed=0, transitions=5, server=SERVER):
+    """生成第 index 个issue的状态流转历史（与 changelog.histories 结构一致）"""
+    rng = issue_rng(index, seed + 1)
+    created = datetime(2025, 1, 1) + timedelta(minutes=index * 7)
+    histories = []
+    status = 'NEW'
+    moment = created
+    for number in range(transitions):
+        moment += timedelta(minutes=rng.randint(10, 5 * 24 * 60))
+        to_status = rng.choice([name for name in STATUSES if name != status])
+        author = rng.choice(USERS)
+        histories.append({
+            'id': str(index * 100 + number),
+            'author': make_user(author, server),
+            'created': moment.strftime('%Y-%m-%dT%H:%M:%S.000+0800'),
+            'items': [{'field': 'status', 'fieldtype': 'jira', 'from': str(STATUSES.index(status)),
+                       'fromString': status, 'to': str(STATUSES.index(to_status)), 'toString': to_status}],
+        })
+        status = to_status
+    return histories
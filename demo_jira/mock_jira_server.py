@@ -0,0 +1,296 @@
+# 本地模拟JIRA服务器（离线测试/基准测试用）
+# 用合成数据实现导出用到的 REST 接口：分页搜索、changelog、附件下载、字段列表、收藏过滤器、当前用户、
+# 项目/状态/优先级/可分配用户列表、看板和sprint、issue关联；编辑、分配、流转等写操作只记录在 server.writes 中，不改变数据
+# py mock_jira_server.py [issue数量] [每个请求的延迟秒数]
+
+# DOC REF
+# https://docs.python.org/zh-cn/3/library/http.server.html
+# https://developer.atlassian.com/cloud/jira/platform/rest/v2/api-group-issue-search/#api-rest-api-2-search-get
+
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from jira_synthetic import (make_raw_issue, make_changelog, make_user, attachment_content, make_board, make_sprint,
+                            sprint_id, issue_key, PROJECTS, STATUSES, PRIORITIES, USERS, SPRINTS_PER_BOARD)
+
+# 与 Jira Cloud 一致，单页最多返回100条
+MAX_RESULTS = 100
+CHANGELOG_PATTERN = re.compile(r'^/rest/api/2/issue/([A-Z0-9]+-\d+)/changelog$')
+ATTACHMENT_PATTERN = re.compile(r'^/rest/api/2/attachment/content/(\d+)$')
+SPRINT_LIST_PATTERN = re.compile(r'^/rest/agile/1.0/board/(\d+)/sprint$')
+SPRINT_IN_PATTERN = re.compile(r'\bsprint\s+in\s*\(([^)]*)\)', re.IGNORECASE)
+TRANSITIONS_PATTERN = re.compile(r'^/rest/api/2/issue/([A-Z0-9]+-\d+)/transitions$')
+WRITE_PATTERN = re.compile(r'^/rest/api/2/issue/([A-Z0-9]+-\d+)(/assignee|/transitions)?$')
+KEY_IN_PATTERN = re.compile(r'key\s+in\s*\(([^)]*)\)', re.IGNORECASE)
+# 计数汇总、sprint导出用到的简单条件：status/priority/assignee = "值"、sprint = 数字 或 is EMPTY，多个条件按 AND 处理
+CLAUSE_PATTERN = re.compile(r'\b(status|priority|assignee|sprint)\s*(?:=\s*(?:"((?:[^"\\]|\\.)*)"|(\d+))|is\s+EMPTY)',
+                            re.IGNORECASE)
+# 排序只识别 ORDER BY key / created（合成issue的创建时间随序号递增）
+ORDER_PATTERN = re.compile(r'\bORDER\s+BY\s+(key|created)(?:\s+(ASC|DESC))?', re.IGNORECASE)
+
+# /rest/api/2/field 的响应（与合成issue的字段一致）
+MOCK_FIELDS = [
+    {'id': field_id, 'key': field_id, 'name': name, 'custom': field_id.startswith('customfield_'),
+     'navigable': True, 'searchable': True, 'clauseNames': [name.lower()], 'schema': {'type': field_type}}
+    for field_id, name, field_type in [
+        ('issuetype', 'Issue Type', 'issuetype'),
+        ('summary', 'Summary', 'string'),
+        ('assignee', 'Assignee', 'user'),
+        ('reporter', 'Reporter', 'user'),
+        ('status', 'Status', 'status'),
+        ('created', 'Created', 'datetime'),
+        ('updated', 'Updated', 'datetime'),
+        ('priority', 'Priority', 'priority'),
+        ('attachment', 'Attachment', 'array'),
+        ('customfield_10041', 'Issue Severity', 'option'),
+        ('customfield_10030', 'Reproduce rate', 'option'),
+        ('customfield_10016', 'Story Points', 'number'),
+        ('resolutiondate', 'Resolved', 'datetime'),
+        ('issuelinks', 'Linked Issues', 'array'),
+    ]
+]
+# /rest/api/2/filter/favourite 的响应：过滤器名 -> JQL（模拟服务器只识别 key in (...)，其余JQL返回全部issue）
+MOCK_FILTERS = {
+    'Feraligatr-23282 库总_filter': 'project IN (FERA, ER23282) ORDER BY created DESC',
+    '23282-未修复-filter': 'project IN (FERA, ER23282) AND status IN (Open, NEW, ReOpen) ORDER BY created DESC',
+}
+
+def issue_index(key):
+    """合成issue的key与序号一一对应：序号 index 的key为 <项目>-<index + 1>"""
+    return int(key.rpartition('-')[2]) - 1
+
+class MockJiraHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 才能保持长连接，客户端连接池可以复用
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def static_json(self, path):
+        """元数据接口的固定响应，没有对应接口时返回None"""
+        base_url = self.server.base_url
+        if path == '/rest/api/2/myself':
+            return make_user('user00', base_url)
+        if path == '/rest/api/2/serverInfo':
+            return {'baseUrl': base_url, 'version': '9.12.0', 'versionNumbers': [9, 12, 0],
+                    'deploymentType': 'Server', 'serverTitle': 'Mock JIRA'}
+        if path == '/rest/api/2/field':
+            return MOCK_FIELDS
+        if path == '/rest/api/2/project':
+            return [{'self': f'{base_url}/rest/api/2/project/{10000 + number}', 'id': str(10000 + number),
+                     'key': key, 'name': key, 'projectTypeKey': 'software'} for number, key in enumerate(PROJECTS)]
+        if path == '/rest/api/2/status':
+            return [{'self': f'{base_url}/rest/api/2/status/{number}', 'id': str(number), 'name': name}
+                    for number, name in enumerate(STATUSES)]
+        if path == '/rest/api/2/priority':
+            return [{'self': f'{base_url}/rest/api/2/priority/{number}', 'id': str(number), 'name': name}
+                    for number, name in enumerate(PRIORITIES)]
+        if path == '/rest/api/2/user/assignable/multiProjectSearch':
+            return [make_user(name, base_url) for name in USERS]
+        if path == '/rest/api/2/filter/favourite':
+            return [{'self': f'{base_url}/rest/api/2/filter/{10000 + number}', 'id': str(10000 + number),
+                     'name': name, 'jql': jql, 'owner': make_user('user00', base_url), 'favourite': True}
+                    for number, (name, jql) in enumerate(MOCK_FILTERS.items())]
+        return None
+
+    def do_GET(self):
+        with self.server.count_lock:
+            self.server.request_count += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        parsed = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(parsed.query).items()}
+        # jira 库把 fields 列表编码为多个同名参数
+        if 'fields' in params:
+            params['fields'] = ','.join(parse_qs(parsed.query)['fields'])
+
+        if parsed.path == '/rest/api/2/search':
+            return self.send_json(self.search(params))
+        data = self.static_json(parsed.path)
+        if data is not None:
+            return self.send_json(data)
+        match = CHANGELOG_PATTERN.match(parsed.path)
+        if match:
+            return self.send_json(self.changelog(match.group(1), params))
+        match = ATTACHMENT_PATTERN.match(parsed.path)
+        if match:
+            return self.send_attachment(params)
+        if parsed.path == '/rest/agile/1.0/board':
+            project = params.get('projectKeyOrId')
+            boards = [make_board(number, self.server.base_url) for number, key in enumerate(PROJECTS)
+                      if project in (None, key)]
+            return self.send_json(self.agile_page(boards))
+        match = SPRINT_LIST_PATTERN.match(parsed.path)
+        if match:
+            project_number = int(match.group(1)) - 1
+            return self.send_json(self.agile_page([make_sprint(project_number, number, self.server.base_url)
+                                                   for number in range(SPRINTS_PER_BOARD)]))
+        if TRANSITIONS_PATTERN.match(parsed.path):
+            # 任意状态都可流转到其他所有状态
+            return self.send_json({'transitions': [{'id': str(11 + number), 'name': name, 'to': {'name': name}}
+                                                   for number, name in enumerate(STATUSES)]})
+        self.send_json({'errorMessages': [f'not found: {parsed.path}']}, 404)
+
+    def agile_page(self, values):
+        """agile 接口的分页结构（数据量小，一页返回全部）"""
+        return {'startAt': 0, 'maxResults': len(values), 'total': len(values), 'isLast': True, 'values': values}
+
+    def do_PUT(self):
+        self.write()
+
+    def do_POST(self):
+        self.write()
+
+    def write(self):
+        """编辑/分配/流转：记录请求，返回 204"""
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'null')
+        path = urlparse(self.path).path
+        with self.server.count_lock:
+            self.server.request_count += 1
+            if WRITE_PATTERN.match(path):
+                self.server.writes.append((self.command, path, body))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if not WRITE_PATTERN.match(path):
+            return self.send_json({'errorMessages': [f'not found: {path}']}, 404)
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def issue(self, index, fields, expand):
+        raw = make_raw_issue(index, self.server.seed, self.server.base_url)
+        if fields and fields != ['*all']:
+            raw['fields'] = {name: value for name, value in raw['fields'].items() if name in fields}
+        if 'changelog' in expand:
+            histories = make_changelog(index, self.server.seed, self.server.transitions, self.server.base_url)
+            raw['changelog'] = {'startAt': 0, 'maxResults': len(histories), 'total': len(histories),
+                                'histories': histories}
+        return raw
+
+    def facets(self):
+        """每个issue的 (status, priority, assignee)，第一次用到时生成"""
+        with self.server.count_lock:
+            if self.server.facets is None:
+                self.server.facets = []
+                for index in range(self.server.issue_count):
+                    fields = make_raw_issue(index, self.server.seed, self.server.base_url)['fields']
+                    self.server.facets.append({
+                        'status': fields['status']['name'],
+                        'priority': fields['priority']['name'],
+                        'assignee': (fields['assignee'] or {}).get('accountId'),
+                        'sprint': str(sprint_id(index)),
+                    })
+            return self.server.facets
+
+    def search(self, params):
+        """分页搜索：jql 只识别 key in (...)、sprint in (...) 和简单的 status/priority/assignee/sprint 条件，其余查询返回全部合成issue
+
+        ORDER BY key / created 按字段排序，其他排序按序号顺序返回。
+        """
+        start_at = int(params.get('startAt', 0))
+        max_results = min(int(params.get('maxResults', 50)), MAX_RESULTS)
+        fields = [name.strip() for name in params.get('fields', '*all').split(',') if name.strip()]
+        expand = params.get('expand', '')
+        match = KEY_IN_PATTERN.search(params.get('jql', ''))
+        if match:
+            indexes = [issue_index(key.strip()) for key in match.group(1).split(',') if key.strip()]
+            indexes = [index for index in indexes if 0 <= index < self.server.issue_count]
+        else:
+            indexes = range(self.server.issue_count)
+        # is EMPTY 时 value 为空字符串
+        clauses = [(field.lower(), value.replace('\\"', '"') or number)
+                   for field, value, number in CLAUSE_PATTERN.findall(params.get('jql', ''))]
+        if clauses:
+            facets = self.facets()
+            indexes = [index for index in indexes
+                       if all(facets[index][field] == (value or None) for field, value in clauses)]
+        match = SPRINT_IN_PATTERN.search(params.get('jql', ''))
+        if match:
+            sprints = {value.strip() for value in match.group(1).split(',')}
+            facets = self.facets()
+            indexes = [index for index in indexes if facets[index]['sprint'] in sprints]
+        match = ORDER_PATTERN.search(params.get('jql', ''))
+        if match:
+            if match.group(1).lower() == 'key':
+                order = lambda index: (issue_key(index).rpartition('-')[0], index)
+            else:
+                order = None
+            indexes = sorted(indexes, key=order, reverse=(match.group(2) or '').upper() == 'DESC')
+        page = indexes[start_at:start_at + max_results]
+        return {
+            'startAt': start_at,
+            'maxResults': max_results,
+            'total': len(indexes),
+            'issues': [self.issue(index, fields, expand) for index in page],
+        }
+
+    def changelog(self, key, params):
+        start_at = int(params.get('startAt', 0))
+        max_results = min(int(params.get('maxResults', 100)), MAX_RESULTS)
+        histories = make_changelog(issue_index(key), self.server.seed, self.server.transitions, self.server.base_url)
+        values = histories[start_at:start_at + max_results]
+        return {
+            'startAt': start_at,
+            'maxResults': max_results,
+            'total': len(histories),
+            'isLast': start_at + len(values) >= len(histories),
+            'values': values,
+        }
+
+    def send_attachment(self, params):
+        body = attachment_content(int(params.get('content_id', 0)))
+        # 支持 Range 请求，用于断点续传
+        start = 0
+        range_match = re.match(r'bytes=(\d+)-$', self.headers.get('Range', ''))
+        if range_match and int(range_match.group(1)) < len(body):
+            start = int(range_match.group(1))
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{len(body) - 1}/{len(body)}')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body) - start))
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+def start_mock_server(issue_count=1000, latency=0.0, seed=0, transitions=5, port=0):
+    """在后台线程启动模拟服务器，返回 (server, base_url)，用完调用 server.shutdown()"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockJiraHandler)
+    server.daemon_threads = True
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    server.issue_count = issue_count
+    server.latency = latency
+    server.seed = seed
+    server.transitions = transitions
+    server.request_count = 0
+    server.count_lock = threading.Lock()
+    server.facets = None
+    server.writes = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.base_url
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    server, base_url = start_mock_server(count, latency, port=8080)
+    print(f"模拟JIRA服务器已启动: {base_url}（{count} 个issue，延迟 {latency}s）")
+    print("💡 按 Ctrl+C 停止")
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -12,12 +12,55 @@
 
 from jira import JIRA
 from jira.exceptions import JIRAError
-from jira.resources import User
+from jira.resources import User, Project
 import configparser
 import os
+import sys
 import pandas as pd
+import xlsxwriter
 import json
-from datetime import datetime
+import csv
+import hashlib
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from jira_meta_cache import META_CACHE
+from jira_governor import GOVERNOR, install_governor
+from jira_progress import PROGRESS
+
+# issue链接前缀
+ISSUE_URL_PREFIX = 'https://nothingtech.atlassian.net/browse/'
+
+# Excel 单个工作表最多 1048576 行（含标题行），超链接最多 65530 个（xlsxwriter 超出后忽略并告警）
+EXCEL_MAX_ROWS = 1048576
+XLSX_MAX_URLS = 65530
+# 隐藏工作表：每行导出时各单元格值的摘要，jira_import.py 据此找出被修改的单元格
+BASELINE_SHEET = '_jira_baseline'
+
+# 导出列配置文件（与 jira_config.ini 同目录）和字段名索引缓存
+COLUMNS_FILE = './jira_columns.ini'
+FIELD_INDEX_FILE = './jira_field_index.json'
+
+# 默认导出列：(列名, 字段id, 属性路径, 缺省值)，未提供 jira_columns.ini 时使用
+# https://nothingtech.atlassian.net/browse/FERA-2119
+DEFAULT_COLUMNS = [
+    ('事务类型', 'issuetype', ('name',), None),
+    ('密钥', 'key', (), None),
+    ('摘要', 'summary', (), None),
+    ('经办人', 'assignee', ('displayName',), '未分配'),
+    ('报告人', 'reporter', ('displayName',), '未分配'),
+    ('状态', 'status', ('name',), None),
+    ('已创建', 'created', (), None),
+    ('已更新', 'updated', (), None),
+    ('优先级', 'priority', ('name',), '无'),
+    ('Issue Severity(严重程度)', 'customfield_10041', (), None),
+    ('Reproduce rate(复现概率)', 'customfield_10030', (), None),
+]
+
+# 匹配JQL末尾的 ORDER BY 子句
+ORDER_BY_PATTERN = re.compile(r'(^|\s)ORDER\s+BY\s.*$', re.IGNORECASE | re.DOTALL)
 
 def load_config():
     config = configparser.ConfigParser()
@@ -36,15 +79,42 @@ def get_jira_from_config():
         config = load_config()
 
         jira_config = config['jira']
-        jira = JIRA(
-            server=jira_config['server'],
-            basic_auth=(jira_config['username'], jira_config['api_token']),
-            timeout=10
-        )
-        print(f"JIRA服务器: {jira.server_url}")
-        print(f"当前用户: {jira.current_user()}")
-        user_info = jira.myself()
-        print(f"登录成功! 用户名: {user_info['displayName']}")
+        META_CACHE.set_owner(jira_config['server'], jira_config['username'])
+        META_CACHE.load_ttls(config)
+        PROGRESS.load_config(config)
+        with PROGRESS.stage('auth'):
+            # 服务器信息走缓存，构造时不再请求 serverInfo
+            jira = JIRA(
+                server=jira_config['server'],
+                basic_auth=(jira_config['username'], jira_config['api_token']),
+                timeout=10,
+                get_server_info=False,
+                # 重试交给 jira_governor（限流、退避统一调度）
+                max_retries=0
+            )
+            GOVERNOR.load_config(config)
+            install_governor(jira, GOVERNOR)
+            # 统计接收字节数
+            jira._session.hooks['response'].append(PROGRESS.on_response)
+            # 与 JIRA 构造函数相同，从服务器信息恢复部署类型和版本号（按版本启用的接口依赖 _version）
+            server_info = META_CACHE.cached('server_info', jira.server_info)
+            jira.deploymentType = server_info.get('deploymentType')
+            if server_info.get('versionNumbers'):
+                jira._version = tuple(server_info['versionNumbers'])
+            META_CACHE.load_cookies(jira._session)
+            print(f"JIRA服务器: {jira.server_url}")
+            # myself() 已包含当前用户id，不再单独调用 current_user()；命中缓存时本次没有校验密码/token
+            user_info = META_CACHE.get('myself')
+            verified = user_info is None
+            if verified:
+                user_info = jira.myself()
+                META_CACHE.set('myself', user_info)
+            print(f"当前用户: {user_info.get('accountId', user_info.get('name'))}")
+            META_CACHE.save_cookies(jira._session)
+        if verified:
+            print(f"登录成功! 用户名: {user_info['displayName']}")
+        else:
+            print(f"使用缓存的登录信息（本次未校验密码/token）: {user_info['displayName']}")
         print(f"邮箱: {user_info['emailAddress']}")
         return jira
     except JIRAError as e:
@@ -58,7 +128,8 @@ def get_jira_from_config():
 def get_jira_projects(jira_client):
     """获取所有项目信息"""
     try:
-        projects = jira_client.projects()
+        raw_projects = META_CACHE.cached('projects', lambda: [project.raw for project in jira_client.projects()])
+        projects = [Project(jira_client._options, jira_client._session, raw=raw) for raw in raw_projects]
         print("📋 项目列表:")
         for project in projects:
             if ((project.key == 'FERA' and project.name == 'Feraligatr-23282 ') or
@@ -75,6 +146,10 @@ def get_jira_projects(jira_client):
 # 获取当前用户的所有过滤器
 def get_all_filters(jira_client):
     try:
+        cached_filters = META_CACHE.get('filters')
+        if cached_filters is not None:
+            print("📋 所有过滤器（缓存）:")
+            return cached_filters
         filters = jira_client.favourite_filters()
         print("📋 所有过滤器:")
         # ID:17896 名称：23282-未修复-filter
@@ -92,15 +167,23 @@ def get_all_filters(jira_client):
             # print(f"  JQL: {filter_obj.jql}")
             # print()
             filters_data[filter_obj.name] = filter_obj.jql
+        META_CACHE.set('filters', filters_data)
         return filters_data
     except Exception as e:
         print(f"获取过滤器失败: {e}")
         return []
 
-# 获取当前用户的所有fields
-def get_all_fields(jira_client):
+# 获取当前用户的所有fields（refresh=True 时忽略缓存重新获取）
+def get_all_fields(jira_client, refresh=False):
     try:
+        if refresh:
+            META_CACHE.invalidate('fields')
+        fields = META_CACHE.get('fields')
+        if fields is not None:
+            print("📋 所有fields（缓存，见 output.txt）")
+            return fields
         fields = jira_client.fields()
+        META_CACHE.set('fields', fields)
 
         data = []
         print("📋 所有fields:")
@@ -121,46 +204,281 @@ def get_all_fields(jira_client):
         print(f"获取fields失败: {e}")
         return []
 
-def export_jira_to_excel(jira, jql_query, output_file):
-    """导出JIRA数据到Excel"""
+def load_column_spec(path=COLUMNS_FILE):
+    """读取导出列配置，返回 [(列名, 字段名, 属性路径, 缺省值)]，文件不存在时返回None
+
+    配置格式（每行一列，顺序即导出顺序）：
+        列名 = 字段名[.属性[.属性]] [| 缺省值]
+    字段名可以写JIRA界面上的名称（如 Assignee），也可以直接写字段id（如 customfield_10041）。
+    """
+    if not os.path.exists(path):
+        return None
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.optionxform = str  # 保留列名大小写
+    parser.read(path, encoding='utf-8')
+    spec = []
+    for header, value in parser.items('columns'):
+        field_path, _, default = value.partition('|')
+        name, *attrs = [part.strip() for part in field_path.split('.')]
+        spec.append((header, name, tuple(attrs), default.strip() or None))
+    return spec
+
+def load_field_index(jira, refresh=False):
+    """字段名 -> 字段id 索引，缓存在 jira_field_index.json，缺失或 refresh 时由 get_all_fields 重建"""
+    if not refresh and os.path.exists(FIELD_INDEX_FILE):
+        with open(FIELD_INDEX_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    index = {}
+    for field in get_all_fields(jira, refresh):
+        index[field['name']] = field['id']
+        index[field['id']] = field['id']
+    with open(FIELD_INDEX_FILE, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=4, ensure_ascii=False)
+    return index
+
+def resolve_columns(jira, spec=None):
+    """将列配置中的字段名解析为字段id，返回与 DEFAULT_COLUMNS 同结构的列表"""
+    if spec is None:
+        spec = load_column_spec()
+    if spec is None:
+        return DEFAULT_COLUMNS
+    index = load_field_index(jira)
+    if any(name != 'key' and name not in index for _, name, _, _ in spec):
+        # 有新字段不在缓存中，重建一次索引
+        index = load_field_index(jira, refresh=True)
+    columns = []
+    for header, name, attrs, default in spec:
+        if name != 'key' and name not in index:
+            print(f"⚠️ 未找到字段: {name}（列: {header}），按字段id处理")
+        columns.append((header, index.get(name, name), attrs, default))
+    return columns
+
+def projection_fields(columns):
+    """导出列所需的字段id列表，用作 search_issues 的 fields 参数，只传输需要的字段"""
+    return ','.join(dict.fromkeys(field_id for _, field_id, _, _ in columns if field_id != 'key'))
+
+def key_column(columns):
+    """密钥（超链接）列的序号，列配置中没有key时返回None"""
+    for col, (_, field_id, _, _) in enumerate(columns):
+        if field_id == 'key':
+            return col
+    return None
+
+def issue_to_row(issue, columns=DEFAULT_COLUMNS):
+    """将单个issue转换为导出行（列名 -> 值）"""
+    row = {}
+    for header, field_id, attrs, default in columns:
+        if field_id == 'key':
+            value = issue.key
+        else:
+            value = getattr(issue.fields, field_id, None)
+        for attr in attrs:
+            value = getattr(value, attr, None)
+        row[header] = default if value is None else value
+    return row
+
+def cell_value(value):
+    """转换为xlsxwriter可直接写入的单元格值（JIRA资源对象转为字符串）"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+def iter_issue_pages(jira, jql_query, page_size=100, fields=None):
+    """按页拉取issues的生成器，内存中同一时间只保留一页"""
+    start_at = 0
+    while True:
+        with PROGRESS.stage('search'):
+            page = jira.search_issues(jql_query, startAt=start_at, maxResults=page_size, fields=fields)
+        if not page:
+            break
+        PROGRESS.on_page(len(page), page.total)
+        yield page
+        start_at += len(page)
+        if start_at >= page.total:
+            break
+
+def raw_value(value):
+    """原始JSON字段值转为单元格值（选项、用户等对象取其显示名）"""
+    if isinstance(value, dict):
+        for name in ('value', 'name', 'displayName', 'key'):
+            if name in value:
+                return value[name]
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, list):
+        return ', '.join(str(raw_value(item)) for item in value)
+    return value
+
+def raw_extractor(field_id, attrs, default):
+    """生成从原始issue JSON中取某一列值的函数"""
+    def extract(raw_issue):
+        if field_id == 'key':
+            value = raw_issue['key']
+        else:
+            value = raw_issue['fields'].get(field_id)
+        for attr in attrs:
+            value = value.get(attr) if isinstance(value, dict) else None
+        return default if value is None else raw_value(value)
+    return extract
+
+def iter_raw_pages(jira, jql_query, page_size=100, fields=None, expand=None):
+    """按页拉取原始JSON（json_result=True），不构造 Issue 资源对象"""
+    start_at = 0
+    while True:
+        with PROGRESS.stage('search'):
+            result = jira.search_issues(jql_query, startAt=start_at, maxResults=page_size,
+                                        fields=fields, expand=expand, json_result=True)
+        page = result.get('issues', [])
+        if not page:
+            break
+        PROGRESS.on_page(len(page), result.get('total'))
+        yield page
+        start_at += len(page)
+        if start_at >= result.get('total', 0):
+            break
+
+def extract_columns(raw_issues, columns, arrays=None):
+    """将一页原始issue按列抽取到列数组（列名 -> 值列表），可传入 arrays 跨页累加"""
+    if arrays is None:
+        arrays = {header: [] for header, _, _, _ in columns}
+    for header, field_id, attrs, default in columns:
+        arrays[header].extend(map(raw_extractor(field_id, attrs, default), raw_issues))
+    return arrays
+
+def fetch_columns(jira, jql_query, columns=DEFAULT_COLUMNS, page_size=100):
+    """原始JSON快速路径：拉取全部结果并直接按列组织，可直接交给 pd.DataFrame"""
+    arrays = None
+    for page in iter_raw_pages(jira, jql_query, page_size, projection_fields(columns)):
+        with PROGRESS.stage('transform'):
+            arrays = extract_columns(page, columns, arrays)
+    if arrays is None:
+        arrays = {header: [] for header, _, _, _ in columns}
+    return arrays
+
+def issue_key_sort(key):
+    """issue key 的自然排序键：FERA-9 排在 FERA-10 之前"""
+    project, _, number = key.rpartition('-')
+    return project, int(number) if number.isdigit() else 0
+
+def strip_order_by(jql_query):
+    """去掉JQL末尾的 ORDER BY 子句，便于追加条件"""
+    return ORDER_BY_PATTERN.sub('', jql_query.strip()).strip()
+
+def jql_datetime(jira, value, round_up=False):
+    """把 REST 返回的时间（带时区偏移）转换为JQL时间字面量
+
+    JQL中的时间按当前用户在JIRA中设置的时区解释，先换算到该时区；JQL只精确到分钟，
+    round_up=True 时向上取整，保证 <= 条件包含 value 本身。
+    """
+    moment = datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f%z')
+    zone = META_CACHE.cached('myself', jira.myself).get('timeZone')
+    if zone:
+        try:
+            moment = moment.astimezone(ZoneInfo(zone))
+        except (ZoneInfoNotFoundError, ValueError):
+            # 本机没有该时区数据（Windows 未装 tzdata）时沿用 REST 返回的偏移
+            pass
+    if round_up and (moment.second or moment.microsecond):
+        moment += timedelta(minutes=1)
+    return moment.strftime('%Y-%m-%d %H:%M')
+
+def newest_created(jira, jql_query):
+    """过滤器中最新issue的创建时间（取服务器上的值，不用本机时间），没有issue时返回None"""
+    base = strip_order_by(jql_query)
+    page = jira.search_issues(f'{base} ORDER BY created DESC' if base else 'ORDER BY created DESC',
+                              maxResults=1, fields='created')
+    return jql_datetime(jira, page[0].fields.created, round_up=True) if page else None
+
+def shard_jql(jql_query, frozen_at):
+    """改写JQL用于分片拉取：去掉原排序，冻结创建时间上限，按key排序"""
+    base = strip_order_by(jql_query)
+    frozen = f'created <= "{frozen_at}"'
+    where = f'({base}) AND {frozen}' if base else frozen
+    return f'{where} ORDER BY key ASC'
+
+def iter_issues_parallel(jira, jql_query, workers=4, page_size=100, overlap=5, fields=None):
+    """并行分片拉取issues，按服务器返回的key顺序、无重复地逐个产出
+
+    查询按 startAt 窗口切分成互相独立的分片，在有界线程池中并发拉取，
+    最多提前请求 2 倍线程数的分片，按顺序每拿到一个分片就产出，不把全部结果堆在内存里。
+    相邻窗口重叠 overlap 条，拉取期间即使有issue移出过滤器导致结果前移，
+    也不会漏掉；重叠带来的重复按key精确去重（只跳过上一个分片中已产出的key），
+    不依赖本地排序与服务器 ORDER BY key 一致。
+    新建的issue由创建时间上限排除，上限取服务器上最新issue的创建时间。
+    """
+    frozen_at = newest_created(jira, jql_query)
+    if frozen_at is None:
+        return
+    jql = shard_jql(jql_query, frozen_at)
+    total = jira.search_issues(jql, maxResults=1, fields='key').total
+    stride = max(page_size - overlap, 1)
+    starts = iter(range(0, total, stride))
+    pending = deque()
+
+    def fetch_shard(start_at):
+        page = jira.search_issues(jql, startAt=start_at, maxResults=page_size, fields=fields)
+        PROGRESS.on_page(len(page), total)
+        return page
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    def fill():
+        for start_at in starts:
+            pending.append(executor.submit(fetch_shard, start_at))
+            if len(pending) >= workers * 2:
+                break
+
+    previous_keys = set()
+    count = 0
     try:
-        issues = jira.search_issues(jql_query, maxResults=False)
-        # 准备数据
-        data = []
-        # https://nothingtech.atlassian.net/browse/FERA-2119
-        for issue in issues:
-            data.append({
-                '事务类型': issue.fields.issuetype,
-                '密钥': issue.key,
-                '摘要': issue.fields.summary,
-                '经办人': getattr(issue.fields.assignee, 'displayName', '未分配'),
-                '报告人': getattr(issue.fields.reporter, 'displayName', '未分配'),
-                '状态': issue.fields.status.name,
-                '已创建': issue.fields.created,
-                '已更新': issue.fields.updated,
-                '优先级': getattr(issue.fields.priority, 'name', '无'),
-                'Issue Severity(严重程度)': issue.fields.customfield_10041,
-                'Reproduce rate(复现概率)': issue.fields.customfield_10030,
-            })
-        # 创建DataFrame并导出到Excel
-        df = pd.DataFrame(data)
+        fill()
+        while pending:
+            # 分片在工作线程中拉取，search 阶段按主线程等待的墙钟时间计，避免多线程重复累计
+            with PROGRESS.stage('search'):
+                shard = pending.popleft().result()
+            fill()
+            shard_keys = set()
+            for issue in shard:
+                shard_keys.add(issue.key)
+                if issue.key in previous_keys:
+                    continue
+                count += 1
+                yield issue
+            previous_keys = shard_keys
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if count != total:
+        PROGRESS.message(f"⚠️ 分片拉取得到 {count} 条，与总数 {total} 不一致（拉取期间过滤器结果有变化）")
 
-        # 使用ExcelWriter获取工作簿和工作表对象（指定解析引擎使用xlsxwriter）
-        with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
+def export_jira_to_excel(jira, jql_query, output_file, workers=1, columns=DEFAULT_COLUMNS, raw=False, fmt='xlsx',
+                         baseline=False):
+    """导出JIRA数据到Excel（raw=True 时走原始JSON按列抽取的快速路径）
 
-            df.to_excel(writer, sheet_name='Sheet1', index=False)
+    fmt 为 csv / jsonl / parquet 时改为流式写入对应格式，列配置相同。
+    baseline=True 时附带 jira_import.py 回写用的隐藏摘要工作表（计算摘要较慢，默认不写）。
+    """
+    if fmt != 'xlsx':
+        return export_jira_to_excel_stream(jira, jql_query, output_file, workers=workers, columns=columns, raw=raw,
+                                           fmt=fmt)
+    try:
+        PROGRESS.begin()
+        if raw:
+            df = pd.DataFrame(fetch_columns(jira, jql_query, columns))
+        else:
+            fields = projection_fields(columns)
+            if workers > 1:
+                issues = iter_issues_parallel(jira, jql_query, workers, fields=fields)
+            else:
+                # 按页拉取（与 maxResults=False 相同的分页方式），每页更新进度
+                issues = (issue for page in iter_issue_pages(jira, jql_query, fields=fields) for issue in page)
+            # 准备数据
+            data = list(PROGRESS.timed_iter('transform', (issue_to_row(issue, columns) for issue in issues)))
+            # 创建DataFrame并导出到Excel
+            df = pd.DataFrame(data)
 
+        # 使用ExcelWriter获取工作簿和工作表对象（指定解析引擎使用xlsxwriter）
+        with PROGRESS.stage('write'), pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
             # 获取工作簿对象
             workbook = writer.book
-            # print(f"工作簿类型: {type(workbook)}")
-            # print(f"工作表名称: {workbook.sheetnames}")
-
-            # 获取工作表对象
-            worksheet = writer.sheets['Sheet1']
-            # print(f"工作表类型: {type(worksheet)}")
-
-            # 设置 C 列的宽度为 20
-            worksheet.set_column('C:C', 20)
 
             # 创建蓝色下划线格式
             blue_underline_format = workbook.add_format({
@@ -168,24 +486,220 @@ def export_jira_to_excel(jira, jql_query, output_file):
                 'underline': 1
             })
 
-            # 定义前缀
-            prefix = 'https://nothingtech.atlassian.net/browse/'
-            # 为第二列添加超链接
-            for row in range(1, len(df)+1):  # 从第1行开始（跳过标题行）
-                b_column_data = df.iloc[row-1, 1]  # 获取第row行第二列数据（索引从0开始）
-                new_b_column_data = prefix + b_column_data
-                worksheet.write_url(row, 1, new_b_column_data, blue_underline_format, b_column_data) # 行索引跳过表头
+            key_col = key_column(columns)
+            # 超过单表行数上限时按 Sheet1、Sheet2... 分表写入，每个工作表只写一次
+            for number, start in enumerate(range(0, max(len(df), 1), EXCEL_MAX_ROWS - 1), 1):
+                sheet_name = f'Sheet{number}'
+                part = df.iloc[start:start + EXCEL_MAX_ROWS - 1]
+                part.to_excel(writer, sheet_name=sheet_name, index=False)
+
+                # 获取工作表对象
+                worksheet = writer.sheets[sheet_name]
 
-            worksheet.set_column('B:B', 13, blue_underline_format)
-            # 保存数据
-            df.to_excel(writer, sheet_name='Sheet1', index=False)
+                # 设置 C 列的宽度为 20
+                worksheet.set_column('C:C', 20)
 
-            print(f"数据已导出到: {output_file}")
+                # 为密钥列（默认第二列）添加超链接，覆盖 to_excel 写入的纯文本
+                if key_col is not None and not part.empty:
+                    for row, key in enumerate(part.iloc[:, key_col].tolist(), 1):  # 从第1行开始（跳过标题行）
+                        write_key_cell(worksheet, row, key_col, key, blue_underline_format)
+                    worksheet.set_column(key_col, key_col, 13, blue_underline_format)
+            if baseline and key_col is not None:
+                write_baseline = baseline_writer(workbook, list(df.columns), key_col)
+                for values in df.itertuples(index=False):
+                    write_baseline(values)
+            PROGRESS.rows_written(len(df), len(df) + 1)
+
+        PROGRESS.finish()
+        print(f"数据已导出到: {output_file}")
         return []
     except Exception as e:
+        PROGRESS.finish()
         print(f"获取issues失败: {e}")
         return []
 
+def write_key_cell(worksheet, row, col, key, link_format):
+    """写入密钥超链接；超出单表超链接上限的行改用 HYPERLINK 公式（公式不计入上限，同样可点击）"""
+    if row <= XLSX_MAX_URLS:
+        worksheet.write_url(row, col, ISSUE_URL_PREFIX + key, link_format, key)
+    else:
+        worksheet.write_formula(row, col, f'=HYPERLINK("{ISSUE_URL_PREFIX}{key}","{key}")', link_format, key)
+
+def baseline_text(value):
+    """单元格值的规范文本：与用 openpyxl 读回的值一致（空串读回为空，3.0 读回为 3）"""
+    value = cell_value(value)
+    if value is None or value != value:  # NaN（pandas 缺失值）写入为空单元格
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+def cell_digest(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=4).hexdigest()
+
+def row_digest(texts):
+    return hashlib.blake2b('\x1f'.join(texts).encode('utf-8'), digest_size=8).hexdigest()
+
+def baseline_row(values, key_col):
+    """隐藏工作表的一行：密钥、整行摘要、各列摘要（空格分隔放在一个单元格中，减少写入的单元格数）"""
+    texts = [baseline_text(value) for value in values]
+    return [texts[key_col], row_digest(texts), ' '.join(cell_digest(text) for text in texts)]
+
+def baseline_writer(workbook, headers, key_col):
+    """返回逐行写入隐藏摘要工作表的函数，超过单表行数上限时续写到 _jira_baseline_2..."""
+    state = {'worksheet': None, 'row': 0, 'sheets': 0}
+
+    def write(values):
+        if state['worksheet'] is None or state['row'] == EXCEL_MAX_ROWS - 1:
+            state['sheets'] += 1
+            suffix = f"_{state['sheets']}" if state['sheets'] > 1 else ''
+            state['worksheet'] = workbook.add_worksheet(BASELINE_SHEET + suffix)
+            state['worksheet'].hide()
+            state['worksheet'].write_row(0, 0, [headers[key_col], '_row'] + list(headers))
+            state['row'] = 0
+        state['row'] += 1
+        state['worksheet'].write_row(state['row'], 0, baseline_row(values, key_col))
+    return write
+
+def write_rows_to_sheet(workbook, sheet_name, headers, rows, key_col=1, page_size=100, baseline=False):
+    """在工作簿中新建工作表并逐行写入行数据（值列表的可迭代对象），返回写入行数
+
+    超过 Excel 单表行数上限时自动续写到 <表名>_2、<表名>_3... 工作表。
+    baseline=True 时同时写入隐藏的摘要工作表（需要有密钥列），供 jira_import.py 回写修改。
+    """
+    blue_underline_format = workbook.add_format({
+        'font_color': 'blue',
+        'underline': 1
+    })
+
+    def add_sheet(name):
+        worksheet = workbook.add_worksheet(name)
+        # constant_memory 模式下必须按行顺序写入，列宽需在写数据之前设置
+        worksheet.set_column('C:C', 20)
+        if key_col is not None:
+            worksheet.set_column(key_col, key_col, 13, blue_underline_format)
+        worksheet.write_row(0, 0, headers)
+        return worksheet
+
+    worksheet = add_sheet(sheet_name)
+    # constant_memory 模式下各工作表分别按行顺序写入，可以与数据工作表交替写
+    write_baseline = baseline_writer(workbook, headers, key_col) if baseline and key_col is not None else None
+    row = 0
+    sheet_row = 0
+    for values in rows:
+        if write_baseline is not None:
+            values = list(values)
+            write_baseline(values)
+        if sheet_row == EXCEL_MAX_ROWS - 1:
+            suffix = f'_{row // (EXCEL_MAX_ROWS - 1) + 1}'
+            worksheet = add_sheet(sheet_name[:31 - len(suffix)] + suffix)
+            sheet_row = 0
+        row += 1
+        sheet_row += 1
+        for col, value in enumerate(values):
+            if col == key_col:
+                write_key_cell(worksheet, sheet_row, col, value, blue_underline_format)
+            else:
+                worksheet.write(sheet_row, col, cell_value(value))
+        PROGRESS.rows_written(row, page_size)
+    return row
+
+def write_rows_to_excel_stream(headers, rows, output_file, key_col=1, page_size=100, baseline=False):
+    """将行数据逐行写入 constant_memory 模式的单工作表工作簿，返回写入行数（baseline 同 write_rows_to_sheet）"""
+    workbook = xlsxwriter.Workbook(output_file, {'constant_memory': True})
+    try:
+        return write_rows_to_sheet(workbook, 'Sheet1', headers, rows, key_col, page_size, baseline=baseline)
+    finally:
+        workbook.close()
+
+def write_rows_to_csv_stream(headers, rows, output_file, key_col=1, page_size=100):
+    """逐行写入CSV（utf-8-sig 编码，Excel可直接打开），返回写入行数"""
+    row = 0
+    with open(output_file, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        for values in rows:
+            writer.writerow([cell_value(value) for value in values])
+            row += 1
+            PROGRESS.rows_written(row, page_size)
+    return row
+
+def write_rows_to_jsonl_stream(headers, rows, output_file, key_col=1, page_size=100):
+    """逐行写入JSON Lines（每行一个 列名 -> 值 的对象），返回写入行数"""
+    row = 0
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for values in rows:
+            record = dict(zip(headers, (cell_value(value) for value in values)))
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            row += 1
+            PROGRESS.rows_written(row, page_size)
+    return row
+
+def write_rows_to_parquet_stream(headers, rows, output_file, key_col=1, page_size=100, row_group_size=10000):
+    """按 row_group_size 行一个行组写入Parquet（所有列为字符串），返回写入行数"""
+    # pip install pyarrow，只有导出Parquet时才需要
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(header, pa.string()) for header in headers])
+    batch = [[] for _ in headers]
+    row = 0
+    with pq.ParquetWriter(output_file, schema, compression='snappy') as writer:
+        for values in rows:
+            for column, value in zip(batch, values):
+                value = cell_value(value)
+                column.append(None if value is None else str(value))
+            row += 1
+            if row % row_group_size == 0:
+                writer.write_table(pa.Table.from_arrays(batch, schema=schema))
+                batch = [[] for _ in headers]
+            PROGRESS.rows_written(row, row_group_size)
+        if headers and batch[0]:
+            writer.write_table(pa.Table.from_arrays(batch, schema=schema))
+    return row
+
+# 导出格式 -> 逐行写入函数，参数均为 (headers, rows, output_file, key_col, page_size)
+ROW_WRITERS = {
+    'xlsx': write_rows_to_excel_stream,
+    'csv': write_rows_to_csv_stream,
+    'jsonl': write_rows_to_jsonl_stream,
+    'parquet': write_rows_to_parquet_stream,
+}
+
+def export_jira_to_excel_stream(jira, jql_query, output_file, page_size=100, workers=1, columns=DEFAULT_COLUMNS,
+                                raw=False, fmt='xlsx', baseline=False):
+    """流式导出JIRA数据到Excel（或 fmt 指定的 csv / jsonl / parquet）
+
+    逐页拉取issues，每行直接写入 constant_memory 模式的 xlsxwriter 工作簿，
+    写完一行即刷到临时文件，峰值内存与过滤器大小无关。baseline 同 export_jira_to_excel，只对 xlsx 有效。
+    """
+    try:
+        PROGRESS.begin()
+        fields = projection_fields(columns)
+        if raw:
+            rows = (row for page in iter_raw_pages(jira, jql_query, page_size, fields)
+                    for row in zip(*extract_columns(page, columns).values()))
+        else:
+            if workers > 1:
+                issues = iter_issues_parallel(jira, jql_query, workers, page_size, fields=fields)
+            else:
+                issues = (issue for page in iter_issue_pages(jira, jql_query, page_size, fields) for issue in page)
+            rows = (issue_to_row(issue, columns).values() for issue in issues)
+
+        headers = [header for header, _, _, _ in columns]
+        # 写入函数逐行拉取：取下一行的时间计 transform（其中拉取页的时间计 search），其余计 write
+        with PROGRESS.stage('write'):
+            options = {'baseline': True} if baseline and fmt == 'xlsx' else {}
+            row = ROW_WRITERS[fmt](headers, PROGRESS.timed_iter('transform', rows), output_file, key_column(columns),
+                                   page_size, **options)
+        PROGRESS.finish()
+        print(f"数据已导出到: {output_file}")
+        return row
+    except Exception as e:
+        PROGRESS.finish()
+        print(f"获取issues失败: {e}")
+        return 0
+
 def interactive_key_selector(data):
     """
     允许用户通过数字序号选择字典中的 Key 并显示对应的值。
@@ -248,10 +762,31 @@ def interactive_key_selector(data):
 
 if __name__ == '__main__':
     print('MAIN_ENTRY')
+    # py test_jira.py --refresh 忽略本地元数据缓存
+    if '--refresh' in sys.argv:
+        META_CACHE.invalidate()
     jira = get_jira_from_config()
     # projects = get_jira_projects(jira)
     filters = get_all_filters(jira)
     jql_query = interactive_key_selector(filters)
     fields = get_all_fields(jira)
-    output_file = "jira_issues.xlsx"
-    export_jira_to_excel(jira, jql_query, output_file)
+    # jira_columns.ini 存在时按配置导出列，只请求需要的字段
+    columns = resolve_columns(jira)
+    config = load_config()
+    # [export] format = xlsx(默认) / csv / jsonl / parquet
+    fmt = config.get('export', 'format', fallback='xlsx')
+    output_file = f"jira_issues.{fmt}"
+    # [export] workers > 1 时并行分片拉取
+    workers = config.getint('export', 'workers', fallback=1)
+    # [export] raw_json = true 时跳过 Issue 资源对象，直接按列抽取原始JSON
+    raw = config.getboolean('export', 'raw_json', fallback=False)
+    # [export] baseline = true 时附带回写用的隐藏摘要工作表（用 jira_import.py 回写修改时才需要）
+    baseline = config.getboolean('export', 'baseline', fallback=False)
+    # jira_config.ini 中 [export] stream = true 时使用流式导出（适合大过滤器）
+    if config.getboolean('export', 'stream', fallback=False):
+        export_jira_to_excel_stream(jira, jql_query, output_file, workers=workers, columns=columns, raw=raw, fmt=fmt,
+                                    baseline=baseline)
+    else:
+        export_jira_to_excel(jira, jql_query, output_file, workers=workers, columns=columns, raw=raw, fmt=fmt,
+                             baseline=baseline)
+    GOVERNOR.report()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+新闻存档（SQLite），代替每天一个 news_YYYYMMDD.txt
+每次获取的全部新闻一次事务批量写入：新闻源、排名、热度、获取时间都单独成列，按日期建索引；
+标题和摘要建 FTS5 全文索引。中文没有空格分词，SQLite 支持时用 trigram 分词器，
+否则（3.34 之前的版本）按字符二元组写入索引，查询时同样拆成二元组按短语匹配。
+分词器匹配不了的短关键词（trigram 下 1~2 个字，二元组下 1 个字）查另一个单字+二元组索引，不扫描全表。
+也可以导入以前保存的 txt 报告。
+"""
+
+import glob
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+ARCHIVE_DB = './news_archive.db'
+# 关键词中的分隔符（空格、标点）
+NOISE_PATTERN = re.compile(r'[\W_]+', re.UNICODE)
+# txt 报告的各行
+DATE_PATTERN = re.compile(r'news_(\d{4})(\d{2})(\d{2})\.txt$')
+ITEM_PATTERN = re.compile(r'^(\d+)\. (.*?)(?: \(热度: (\d+)\))?$')
+GENERATED_PATTERN = re.compile(r'^生成时间: (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})$')
+HEADING_PATTERN = re.compile(r'^\W*(.*?)(?: TOP \d+)?$')
+
+def trigram_supported(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.trigram_probe USING fts5(x, tokenize='trigram')")
+        conn.execute('DROP TABLE temp.trigram_probe')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def bigrams(text):
+    """按分隔符切段，每段拆成字符二元组（一个字的段保留该字）"""
+    tokens = []
+    for segment in NOISE_PATTERN.split((text or '').lower()):
+        if len(segment) == 1:
+            tokens.append(segment)
+        tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+    return tokens
+
+def short_grams(text):
+    """短关键词索引的词：每段的全部单字和字符二元组"""
+    tokens = []
+    for segment in NOISE_PATTERN.split((text or '').lower()):
+        tokens.extend(segment)
+        tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+    return tokens
+
+def quote(phrase):
+    return '"' + phrase.replace('"', '""') + '"'
+
+class NewsArchive:
+    """新闻存档：add_fetch 写入一次获取的结果，search 按关键词、日期、新闻源查询"""
+
+    def __init__(self, path=ARCHIVE_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                fetched_at TEXT,
+                day TEXT,
+                source TEXT,
+                rank INTEGER,
+                title TEXT,
+                summary TEXT,
+                hot_value INTEGER,
+                time TEXT,
+                url TEXT,
+                also TEXT
+            );
+            CREATE INDEX IF NOT EXISTS items_day ON items (day);
+            CREATE INDEX IF NOT EXISTS items_source_day ON items (source, day);
+            CREATE TABLE IF NOT EXISTS imports (filename TEXT PRIMARY KEY, imported_at TEXT);
+        ''')
+        # 分词方式在建库时确定，之后沿用（换了 SQLite 版本也不变）
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'tokenizer'").fetchone()
+        if row is None:
+            self.tokenizer = 'trigram' if trigram_supported(self.conn) else 'bigram'
+            with self.conn:
+                self.conn.execute("INSERT INTO meta VALUES ('tokenizer', ?)", (self.tokenizer,))
+                # 无内容（contentless）索引：正文在 items 中，索引只用来找 rowid
+                self.conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(title, summary, "
+                                  f"content='', tokenize='{'trigram' if self.tokenizer == 'trigram' else 'unicode61'}')")
+        else:
+            self.tokenizer = row['value']
+        # 短关键词索引；之前版本建的库没有这张表，建表后按 items 补建
+        if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'items_short'").fetchone():
+            with self.conn:
+                self.conn.execute("CREATE VIRTUAL TABLE items_short USING fts5(title, summary, content='', "
+                                  "tokenize='unicode61')")
+                self.conn.executemany('INSERT INTO items_short (rowid, title, summary) VALUES (?, ?, ?)',
+                                      ((item_id, ' '.join(short_grams(title)), ' '.join(short_grams(summary)))
+                                       for item_id, title, summary in
+                                       self.conn.execute('SELECT id, title, summary FROM items').fetchall()))
+
+    def index_text(self, text):
+        if self.tokenizer == 'trigram':
+            return text or ''
+        return ' '.join(bigrams(text))
+
+    def add_fetch(self, results, fetched_at=None):
+        """写入一次获取的结果（新闻源名称 -> 新闻列表，列表顺序即排名），返回写入条数"""
+        fetched_at = fetched_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        rows = [(fetched_at, fetched_at[:10], source, rank, news.get('title', ''), news.get('summary') or '',
+                 news.get('hot_value') or None, news.get('time') or '', news.get('url', ''),
+                 json.dumps(news['also'], ensure_ascii=False) if news.get('also') else None)
+                for source, news_list in results.items()
+                for rank, news in enumerate(news_list, 1)]
+        if not rows:
+            return 0
+        with self.conn:
+            # 同一事务内分配连续的 id，全文索引按 id 对应，不必逐条取 lastrowid
+            start = self.conn.execute('SELECT COALESCE(MAX(id), 0) FROM items').fetchone()[0] + 1
+            self.conn.executemany('INSERT INTO items (id, fetched_at, day, source, rank, title, summary, hot_value, '
+                                  'time, url, also) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                  [(start + i,) + row for i, row in enumerate(rows)])
+            self.conn.executemany('INSERT INTO items_fts (rowid, title, summary) VALUES (?, ?, ?)',
+                                  [(start + i, self.index_text(row[4]), self.index_text(row[5]))
+                                   for i, row in enumerate(rows)])
+            self.conn.executemany('INSERT INTO items_short (rowid, title, summary) VALUES (?, ?, ?)',
+                                  [(start + i, ' '.join(short_grams(row[4])), ' '.join(short_grams(row[5])))
+                                   for i, row in enumerate(rows)])
+        return len(rows)
+
+    def keyword_filter(self, keywords):
+        """关键词（空格分隔，全部包含）转换为 (items_fts 的 MATCH 表达式, items_short 的 MATCH 表达式)
+
+        trigram 只能匹配 3 个字及以上，二元组只能匹配 2 个字及以上，更短的关键词（按分隔符切段后每段
+        不超过 2 个字）改查 items_short 中的单字 / 二元组；含分隔符的短关键词各段分别匹配，不要求相邻。
+        """
+        phrases = []
+        short = []
+        for keyword in (keywords or '').split():
+            if self.tokenizer == 'trigram':
+                if len(keyword) >= 3:
+                    phrases.append(quote(keyword))
+                else:
+                    short.extend(quote(segment) for segment in NOISE_PATTERN.split(keyword.lower()) if segment)
+                continue
+            for segment in NOISE_PATTERN.split(keyword.lower()):
+                if len(segment) >= 2:
+                    phrases.append(quote(' '.join(bigrams(segment))))
+                elif segment:
+                    short.append(quote(segment))
+        return ' AND '.join(phrases), ' AND '.join(short)
+
+    def search(self, keywords=None, start=None, end=None, source=None, limit=50):
+        """查询存档：start / end 为 YYYY-MM-DD（含），按获取时间倒序、排名顺序返回字典列表"""
+        match, short = self.keyword_filter(keywords)
+        conditions = []
+        params = []
+        if match:
+            conditions.append('items.id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)')
+            params.append(match)
+        if short:
+            conditions.append('items.id IN (SELECT rowid FROM items_short WHERE items_short MATCH ?)')
+            params.append(short)
+        if start:
+            conditions.append('items.day >= ?')
+            params.append(start)
+        if end:
+            conditions.append('items.day <= ?')
+            params.append(end)
+        if source:
+            conditions.append('items.source = ?')
+            params.append(source)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self.conn.execute(f'SELECT * FROM items {where} ORDER BY fetched_at DESC, source, rank LIMIT ?',
+                                 params + [limit]).fetchall()
+        results = []
+        for row in rows:
+            news = dict(row)
+            news['also'] = json.loads(news['also']) if news['also'] else []
+            results.append(news)
+        return results
+
+    def import_text(self, path, headings=None):
+        """导入 format_news_report 生成的 txt 报告，返回导入条数（已导入过的文件返回 0）
+
+        headings 为 报告中的标题 -> 新闻源名称，不在其中的标题去掉图标和“TOP 10”作为名称。
+        获取时间取报告末尾的生成时间，没有时取文件名中的日期。摘要在报告中截断过，按截断后的内容导入。
+        早期版本的报告（36氪摘要没有标签、没有链接行）同样可以导入。
+        """
+        filename = os.path.basename(path)
+        if self.conn.execute('SELECT 1 FROM imports WHERE filename = ?', (filename,)).fetchone():
+            return 0
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+
+        results = {}
+        news_list = None
+        news = None
+        fetched_at = None
+        for number, line in enumerate(lines):
+            generated = GENERATED_PATTERN.match(line)
+            if generated:
+                fetched_at = generated.group(1)
+                continue
+            # 新闻源标题：下一行是分隔线
+            if number + 1 < len(lines) and lines[number + 1].startswith('-' * 10):
+                name = (headings or {}).get(line) or HEADING_PATTERN.match(line).group(1)
+                news_list = results.setdefault(name, [])
+                news = None
+                continue
+            if news_list is None:
+                continue
+            item = ITEM_PATTERN.match(line)
+            if item:
+                news = {'title': item.group(2)}
+                if item.group(3):
+                    news['hot_value'] = int(item.group(3))
+                news_list.append(news)
+                continue
+            if news is None or not line.startswith('   '):
+                continue
+            label, _, value = line.strip().partition(': ')
+            if label == '摘要':
+                news['summary'] = value[:-3] if value.endswith('...') else value
+            elif label == '时间':
+                news['time'] = value
+            elif label == '链接':
+                news['url'] = value
+            elif label.startswith('同时出现在'):
+                news.setdefault('also', []).append((label[len('同时出现在'):], value))
+            elif label != '首次出现':
+                # 早期的报告中36氪摘要没有“摘要:”标签，直接缩进输出（摘要本身可能含有“: ”）
+                value = line.strip()
+                news['summary'] = value[:-3] if value.endswith('...') else value
+
+        if fetched_at is None:
+            date = DATE_PATTERN.search(filename)
+            fetched_at = f'{date.group(1)}-{date.group(2)}-{date.group(3)} 00:00:00' if date else None
+        count = self.add_fetch(results, fetched_at)
+        with self.conn:
+            self.conn.execute('INSERT INTO imports VALUES (?, ?)',
+                              (filename, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+        return count
+
+    def import_directory(self, directory='.', headings=None):
+        """导入目录下全部 news_YYYYMMDD.txt，返回 (文件数, 条数)"""
+        files = sorted(glob.glob(os.path.join(directory, 'news_*.txt')))
+        total = 0
+        for path in files:
+            total += self.import_text(path, headings)
+        return len(files), total
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+新闻接口的本地响应缓存
+按 Cache-Control max-age（或 Expires）判断缓存是否新鲜，新鲜时不发请求；
+过期后带 If-None-Match / If-Modified-Since 重新验证，服务器返回 304 时沿用缓存内容。
+缓存存放在磁盘上，总大小超过上限时按最近最少使用（LRU）淘汰。
+索引只在新增、淘汰缓存时立即写盘；命中和 304 只更新内存中的使用时间、有效期，由 flush()（退出时自动调用）一次写入。
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode
+
+CACHE_DIR = './.news_cache'
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+INDEX_NAME = 'index.json'
+
+def parse_cache_control(value):
+    """Cache-Control 头解析为 {指令: 值}，没有值的指令为 True"""
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else True
+    return directives
+
+def freshness_lifetime(headers, now):
+    """响应可以直接使用的截止时间（time.time()），不允许缓存时返回None"""
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return now
+    if 'max-age' in directives:
+        try:
+            age = int(headers.get('Age', 0))
+            return now + int(directives['max-age']) - age
+        except ValueError:
+            return now
+    if headers.get('Expires'):
+        try:
+            return parsedate_to_datetime(headers['Expires']).timestamp()
+        except (TypeError, ValueError):
+            return now
+    # 没有缓存指令：保存下来，但每次都重新验证
+    return now
+
+class ResponseCache:
+    """GET 请求的磁盘缓存，线程安全（新闻源并发获取时共用一个实例）"""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.index = self.load_index()
+        # 内存中的索引有未写盘的修改（使用时间、有效期）
+        self.dirty = False
+        atexit.register(self.flush)
+        # 本次运行的统计：命中（未发请求）、304、完整下载、请求失败时使用过期缓存
+        self.stats = {'hit': 0, 'revalidated': 0, 'miss': 0, 'stale': 0}
+
+    def load_index(self):
+        path = os.path.join(self.directory, INDEX_NAME)
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def save_index(self):
+        # 先写临时文件再替换，中断时不会留下损坏的索引（调用方持有锁）
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, INDEX_NAME)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(path + '.tmp', path)
+        self.dirty = False
+
+    def flush(self):
+        """把命中、304 更新的使用时间和有效期写盘（没有修改时不写）"""
+        with self.lock:
+            if self.dirty:
+                self.save_index()
+
+    def cache_key(self, url, params=None):
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha1(f'{url}?{query}'.encode('utf-8')).hexdigest()
+
+    def read_body(self, key):
+        try:
+            with open(os.path.join(self.directory, key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def lookup(self, key):
+        """返回 (索引项, 缓存内容)，并更新最近使用时间"""
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return None, None
+            body = self.read_body(key)
+            if body is None:
+                del self.index[key]
+                self.dirty = True
+                return None, None
+            # 最近使用时间只改内存，flush() 时持久化（LRU 顺序跨运行有效），命中时不重写整个索引
+            entry['used'] = time.time()
+            self.dirty = True
+            return dict(entry), body
+
+    def store(self, key, url, response, now):
+        expires = freshness_lifetime(response.headers, now)
+        if expires is None:
+            return
+        body = response.content
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, key)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(body)
+            os.replace(path + '.tmp', path)
+            self.index[key] = {
+                'url': url,
+                'size': len(body),
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'expires': expires,
+                'used': now,
+            }
+            self.evict()
+            self.save_index()
+
+    def refresh(self, key, response, now):
+        """304：沿用缓存内容，按新的响应头更新有效期和验证器"""
+        with self.lock:
+            entry = self.index.get(key)
+            if entry is None:
+                return
+            expires = freshness_lifetime(response.headers, now)
+            entry['expires'] = now if expires is None else expires
+            entry['etag'] = response.headers.get('ETag') or entry['etag']
+            entry['last_modified'] = response.headers.get('Last-Modified') or entry['last_modified']
+            entry['used'] = now
+            self.dirty = True
+
+    def evict(self):
+        """总大小超过上限时删除最久未使用的缓存（调用方持有锁）"""
+        total = sum(entry['size'] for entry in self.index.values())
+        for key in sorted(self.index, key=lambda key: self.index[key]['used']):
+            if total <= self.max_bytes:
+                break
+            total -= self.index.pop(key)['size']
+            try:
+                os.remove(os.path.join(self.directory, key))
+            except OSError:
+                pass
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def get(self, session, url, params=None, timeout=None, throttle=None):
+        """带缓存的 GET，返回响应内容（bytes）；throttle 在真正发请求前调用（如限速），命中缓存时不调用"""
+        key = self.cache_key(url, params)
+        entry, body = self.lookup(key)
+        now = time.time()
+        if entry is not None and now < entry['expires']:
+            self.count('hit')
+            return body
+
+        headers = {}
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+        try:
+            if throttle is not None:
+                throttle(url)
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+            if response.status_code == 304 and entry is not None:
+                self.refresh(key, response, now)
+                self.count('revalidated')
+                return body
+            response.raise_for_status()
+        except Exception:
+            if entry is None:
+                raise
+            # 请求失败时用过期的缓存内容，好过整个新闻源为空
+            self.count('stale')
+            return body
+        self.store(key, url, response, now)
+        self.count('miss')
+        return response.content
+
+    def summary(self):
+        stats = self.stats
+        return (f"缓存命中 {stats['hit']}，304 {stats['revalidated']}，完整下载 {stats['miss']}"
+                + (f"，使用过期缓存 {stats['stale']}" if stats['stale'] else ''))
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨新闻源的近似重复检测
+同一条新闻在知乎、微博、36氪上标题略有不同，按字符二元组（中文不分词也适用）计算 MinHash 签名，
+签名分成若干段（band）建立 LSH 索引，只比较至少有一段完全相同的候选，查找耗时与历史条数基本无关。
+本次获取的重复条目合并为一条并列出所有来源；历史记录保存在 SQLite 中（段哈希建索引），
+几十万条历史也不需要全部载入内存，之前出现过的新闻标注首次出现日期。
+"""
+
+import hashlib
+import random
+import re
+import sqlite3
+from array import array
+from datetime import datetime
+
+HISTORY_DB = './news_history.db'
+# 签名长度 = 段数 × 每段行数；相似度约 (1/BANDS)^(1/ROWS) ≈ 0.54 以上的才容易成为候选
+NUM_PERM = 48
+BANDS = 12
+ROWS = NUM_PERM // BANDS
+# 估计的 Jaccard 相似度达到该值视为同一条新闻
+THRESHOLD = 0.5
+# 摘要只取开头部分（导语最能代表新闻本身）
+SUMMARY_CHARS = 80
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+# 去掉标点、空白和话题符号，只保留文字和数字
+NOISE_PATTERN = re.compile(r'[\W_]+', re.UNICODE)
+
+_rng = random.Random(20240101)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+def shingles(text):
+    """规范化后的字符二元组集合（只有一个字时为该字）"""
+    text = NOISE_PATTERN.sub('', (text or '').lower())
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+def minhash(shingle_set):
+    """MinHash 签名：NUM_PERM 个 32 位整数，空集合返回None"""
+    if not shingle_set:
+        return None
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little')
+              for shingle in shingle_set]
+    return array('I', [min(((a * value + b) % MERSENNE_PRIME) & MAX_HASH for value in hashes)
+                       for a, b in PERMUTATIONS])
+
+def similarity(signature, other):
+    """两个签名相同位置取值相等的比例，即 Jaccard 相似度的估计"""
+    return sum(1 for x, y in zip(signature, other) if x == y) / NUM_PERM
+
+def band_keys(signature):
+    """每段一个 63 位哈希（含段号），可直接存入 SQLite INTEGER"""
+    return [int.from_bytes(hashlib.blake2b(bytes([band]) + signature[band * ROWS:(band + 1) * ROWS].tobytes(),
+                                           digest_size=8).digest(), 'little') >> 1
+            for band in range(BANDS)]
+
+class LSHIndex:
+    """内存中的分段索引：段哈希 -> 条目编号列表"""
+
+    def __init__(self):
+        self.buckets = {}
+
+    def add(self, item, signature):
+        for key in band_keys(signature):
+            self.buckets.setdefault(key, []).append(item)
+
+    def candidates(self, signature):
+        found = set()
+        for key in band_keys(signature):
+            found.update(self.buckets.get(key, ()))
+        return found
+
+class NewsHistory:
+    """SQLite 中的历史新闻签名，按段哈希索引查找"""
+
+    def __init__(self, path=HISTORY_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                title TEXT,
+                sources TEXT,
+                url TEXT,
+                first_seen TEXT,
+                last_seen TEXT,
+                signature BLOB
+            );
+            CREATE TABLE IF NOT EXISTS bands (key INTEGER, item_id INTEGER);
+            CREATE INDEX IF NOT EXISTS bands_key ON bands (key);
+        ''')
+
+    def find(self, signature):
+        """最相似的历史条目 (id, 首次出现, 来源)，没有达到阈值的返回None"""
+        keys = band_keys(signature)
+        rows = self.conn.execute(
+            f'SELECT id, first_seen, sources, signature FROM items WHERE id IN '
+            f'(SELECT item_id FROM bands WHERE key IN ({",".join("?" * len(keys))}))', keys).fetchall()
+        best = None
+        best_score = THRESHOLD
+        for item_id, first_seen, sources, blob in rows:
+            score = similarity(signature, array('I', blob))
+            if score >= best_score:
+                best, best_score = (item_id, first_seen, sources), score
+        return best
+
+    def record(self, entries, now=None):
+        """记录本次的新闻，已有的更新最后出现时间和来源，返回 条目序号 -> 首次出现时间（之前出现过的）"""
+        now = now or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        seen_before = {}
+        with self.conn:
+            for number, entry in enumerate(entries):
+                signature = entry['signature']
+                if signature is None:
+                    continue
+                match = self.find(signature)
+                if match is not None:
+                    item_id, first_seen, sources = match
+                    merged = list(dict.fromkeys(sources.split(',') + entry['sources']))
+                    self.conn.execute('UPDATE items SET last_seen = ?, sources = ? WHERE id = ?',
+                                      (now, ','.join(merged), item_id))
+                    seen_before[number] = first_seen
+                    continue
+                cursor = self.conn.execute(
+                    'INSERT INTO items (title, sources, url, first_seen, last_seen, signature) VALUES (?, ?, ?, ?, ?, ?)',
+                    (entry['title'], ','.join(entry['sources']), entry['url'], now, now, signature.tobytes()))
+                self.conn.executemany('INSERT INTO bands (key, item_id) VALUES (?, ?)',
+                                      [(key, cursor.lastrowid) for key in band_keys(signature)])
+        return seen_before
+
+    def close(self):
+        self.conn.close()
+
+class NewsDeduplicator:
+    """获取和格式化之间的去重环节"""
+
+    def __init__(self, history_path=HISTORY_DB):
+        self.history_path = history_path
+
+    def merge(self, results, order):
+        """合并重复新闻：results 为 新闻源名称 -> 新闻列表，order 为新闻源顺序
+
+        合并后的条目保留在排在前面的新闻源下，增加 also（其他来源的 (名称, 链接)）；
+        之前运行中出现过的新闻增加 first_seen。返回与 results 结构相同的新字典和合并掉的条数。
+        """
+        entries = []
+        for name in order:
+            for news in results.get(name, []):
+                entries.append({
+                    'source': name,
+                    'news': news,
+                    'title_signature': minhash(shingles(news.get('title'))),
+                    'summary_signature': minhash(shingles((news.get('summary') or '')[:SUMMARY_CHARS])),
+                })
+
+        # 标题、摘要各建一个索引，任一相似即为同一条新闻（微博没有摘要，只比较标题）
+        parent = list(range(len(entries)))
+
+        def find(item):
+            while parent[item] != item:
+                parent[item] = parent[parent[item]]
+                item = parent[item]
+            return item
+
+        for field in ('title_signature', 'summary_signature'):
+            index = LSHIndex()
+            for number, entry in enumerate(entries):
+                signature = entry[field]
+                if signature is None:
+                    continue
+                for other in index.candidates(signature):
+                    if similarity(signature, entries[other][field]) >= THRESHOLD:
+                        # 根取编号小的，合并后的条目留在排在前面的新闻源下
+                        root, other_root = find(number), find(other)
+                        parent[max(root, other_root)] = min(root, other_root)
+                index.add(number, signature)
+
+        groups = {}
+        for number in range(len(entries)):
+            groups.setdefault(find(number), []).append(number)
+
+        merged = {name: [] for name in order if name in results}
+        records = []
+        for root, members in sorted(groups.items()):
+            first = entries[root]
+            news = dict(first['news'])
+            others = [entries[member] for member in members[1:]]
+            if others:
+                news['also'] = [(other['source'], other['news']['url']) for other in others]
+                hot_values = [entry['news'].get('hot_value') for entry in [first] + others]
+                if any(hot_values):
+                    news['hot_value'] = max(value or 0 for value in hot_values)
+                if not news.get('summary'):
+                    news['summary'] = next((other['news']['summary'] for other in others
+                                            if other['news'].get('summary')), '')
+            merged[first['source']].append(news)
+            records.append((news, {'title': news['title'], 'url': news['url'],
+                                   'sources': [first['source']] + [other['source'] for other in others],
+                                   'signature': first['title_signature']}))
+
+        if self.history_path:
+            history = NewsHistory(self.history_path)
+            try:
+                seen_before = history.record([record for _, record in records])
+            finally:
+                history.close()
+            for number, first_seen in seen_before.items():
+                records[number][0]['first_seen'] = first_seen
+        return merged, len(entries) - len(groups)
@@ -3,114 +3,220 @@
 """
 每日新闻获取脚本
 支持多个新闻源，可定时运行
+
+新增新闻源：写一个解析函数并用 @news_source 注册（接口地址、每个主机的限速），
+不需要修改 NewsAggregator 和 format_news_report。
+每次获取的新闻写入 SQLite 存档 news_archive.db（全文索引），可按关键词和日期查询，
+以前保存的 news_YYYYMMDD.txt 可以导入存档。
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
+from urllib.parse import urlparse
 import json
+import threading
 import time
 from bs4 import BeautifulSoup
 import schedule
+from news_cache import ResponseCache
+from news_dedup import NewsDeduplicator
+from news_archive import NewsArchive
+
+# 整份报告的截止时间（秒），超时未返回的新闻源标记为超时，不再等待
+REPORT_DEADLINE = 8
+# 单个请求的 (连接, 读取) 超时
+REQUEST_TIMEOUT = (3.05, 10)
+# 同时请求的新闻源数量上限
+MAX_WORKERS = 16
+
+class TokenBucket:
+    """令牌桶：每秒补充 rate 个令牌，最多积累 burst 个，每个请求消耗一个"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """取一个令牌，没有时等待；返回等待的秒数"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # 先预留令牌（可以为负），在锁外等待，同一主机的并发请求按顺序排队
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+class HostRateLimiter:
+    """按主机分别限速，不同主机之间互不影响"""
 
-class NewsAggregator:
     def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def configure(self, host, rate, burst=1):
+        """设置主机的限速，多个新闻源在同一主机上时取较严格的"""
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None or rate < bucket.rate:
+                self.buckets[host] = TokenBucket(rate, burst)
+
+    def acquire(self, url):
+        bucket = self.buckets.get(urlparse(url).hostname)
+        return bucket.acquire() if bucket else 0.0
+
+class NewsSource:
+    """新闻源：名称、接口地址、解析函数和所在主机的限速"""
+
+    def __init__(self, name, url, parser, heading=None, limit_param=None, rate=1.0, burst=1):
+        self.name = name
+        self.url = url
+        self.parser = parser
+        self.heading = heading or f"📰 {name}"
+        self.limit_param = limit_param
+        self.rate = rate
+        self.burst = burst
+
+    @property
+    def host(self):
+        return urlparse(self.url).hostname
+
+# 已注册的新闻源，按注册顺序输出
+NEWS_SOURCES = {}
+
+def news_source(name, url, heading=None, limit_param=None, rate=1.0, burst=1):
+    """注册新闻源的装饰器，被装饰的函数 parser(data, limit) 把接口返回的JSON解析为新闻列表
+
+    新闻条目为字典：title、url 必填，summary（摘要）、hot_value（热度）、time（时间）可选。
+    rate / burst 为该主机每秒请求数和允许的突发请求数。
+    """
+    def register(parser):
+        NEWS_SOURCES[name] = NewsSource(name, url, parser, heading, limit_param, rate, burst)
+        return parser
+    return register
+
+@news_source('知乎热榜', 'https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total', '🔥 知乎热榜 TOP 10',
+             limit_param='limit')
+def parse_zhihu_hot(data, limit):
+    """知乎热榜"""
+    return [{
+        'title': item['target']['title'],
+        'summary': item['target'].get('excerpt', ''),
+        'url': f"https://www.zhihu.com/question/{item['target']['id']}"
+    } for item in data.get('data', [])[:limit]]
+
+@news_source('微博热搜', 'https://weibo.com/ajax/side/hotSearch', '🔥 微博热搜 TOP 10')
+def parse_weibo_hot(data, limit):
+    """微博热搜"""
+    return [{
+        'title': item.get('note', ''),
+        'hot_value': item.get('num', 0),
+        'url': f"https://s.weibo.com/weibo?q=%23{item.get('word', '')}%23"
+    } for item in data.get('data', {}).get('realtime', [])[:limit]]
+
+@news_source('36氪快讯', 'https://36kr.com/api/newsflash', '💼 36氪快讯')
+def parse_36kr_news(data, limit):
+    """36氪快讯"""
+    return [{
+        'title': item.get('title', ''),
+        'summary': item.get('summary', ''),
+        'time': item.get('published_at', ''),
+        'url': f"https://36kr.com/newsflashes/{item.get('id', '')}"
+    } for item in data.get('data', {}).get('items', [])[:limit]]
+
+class NewsAggregator:
+    def __init__(self, deadline=REPORT_DEADLINE, sources=None, cache=True, dedup=True, archive=True):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-
-    def get_zhihu_hot(self, limit=10):
-        """获取知乎热榜"""
-        try:
-            url = "https://www.zhihu.com/api/v3/feed/topstory/hot-lists/total"
-            params = {'limit': limit}
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
-            data = response.json()
-
-            news_list = []
-            for item in data.get('data', [])[:limit]:
-                news_list.append({
-                    'title': item['target']['title'],
-                    'excerpt': item['target'].get('excerpt', ''),
-                    'url': f"https://www.zhihu.com/question/{item['target']['id']}"
-                })
-            return news_list
-        except Exception as e:
-            print(f"获取知乎热榜失败: {e}")
-            return []
-
-    def get_weibo_hot(self, limit=10):
-        """获取微博热搜"""
-        try:
-            url = "https://weibo.com/ajax/side/hotSearch"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            data = response.json()
-
-            news_list = []
-            for item in data.get('data', {}).get('realtime', [])[:limit]:
-                news_list.append({
-                    'title': item.get('note', ''),
-                    'hot_value': item.get('num', 0),
-                    'url': f"https://s.weibo.com/weibo?q=%23{item.get('word', '')}%23"
-                })
-            return news_list
-        except Exception as e:
-            print(f"获取微博热搜失败: {e}")
-            return []
-
-    def get_36kr_news(self, limit=10):
-        """获取36氪快讯"""
+        self.deadline = deadline
+        # sources 为新闻源名称列表，缺省时使用全部已注册的新闻源
+        self.sources = [NEWS_SOURCES[name] for name in (sources or NEWS_SOURCES)]
+        # 共享的 keep-alive 连接池：同一主机的后续请求复用连接，不再每次重新握手
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # 每个主机一个令牌桶，代替各请求之间固定的 time.sleep
+        self.limiter = HostRateLimiter()
+        for source in self.sources:
+            self.limiter.configure(source.host, source.rate, source.burst)
+        # 磁盘响应缓存：有效期内不发请求，过期后条件请求（304 不重新下载）
+        self.cache = ResponseCache() if cache else None
+        # 跨新闻源合并同一条新闻，并记录历史（标注之前出现过的新闻）
+        self.deduplicator = NewsDeduplicator() if dedup else None
+        # 新闻存档：代替每天一个txt文件，archive=False 时仍保存txt
+        self.archive = NewsArchive() if archive else None
+
+    def fetch_source(self, source, limit=10):
+        """获取单个新闻源，失败时返回空列表"""
         try:
-            url = "https://36kr.com/api/newsflash"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            data = response.json()
-
-            news_list = []
-            for item in data.get('data', {}).get('items', [])[:limit]:
-                news_list.append({
-                    'title': item.get('title', ''),
-                    'summary': item.get('summary', ''),
-                    'time': item.get('published_at', ''),
-                    'url': f"https://36kr.com/newsflashes/{item.get('id', '')}"
-                })
-            return news_list
+            params = {source.limit_param: limit} if source.limit_param else None
+            if self.cache is not None:
+                # 命中缓存时不发请求，也不消耗限速令牌
+                body = self.cache.get(self.session, source.url, params, REQUEST_TIMEOUT, self.limiter.acquire)
+                return source.parser(json.loads(body), limit)
+            self.limiter.acquire(source.url)
+            response = self.session.get(source.url, params=params, timeout=REQUEST_TIMEOUT)
+            return source.parser(response.json(), limit)
         except Exception as e:
-            print(f"获取36氪新闻失败: {e}")
+            print(f"获取{source.name}失败: {e}")
             return []
 
-    def format_news_report(self, zhihu_news, weibo_news, kr_news):
-        """格式化新闻报告"""
+    def fetch_all(self, limit=10):
+        """并发获取各新闻源，返回 (新闻源名称 -> 新闻列表, 超时的新闻源)
+
+        所有新闻源同时请求，只有同一主机的请求按该主机的限速排队；超过截止时间仍未返回的不再等待。
+        """
+        executor = ThreadPoolExecutor(max_workers=min(len(self.sources), MAX_WORKERS) or 1)
+        futures = {source.name: executor.submit(self.fetch_source, source, limit) for source in self.sources}
+        wait(futures.values(), timeout=self.deadline)
+        # 不等待超时的线程结束（请求自身的超时到了后线程会退出）
+        executor.shutdown(wait=False, cancel_futures=True)
+        results = {name: future.result() for name, future in futures.items() if future.done()}
+        late = [name for name, future in futures.items() if not future.done()]
+        return results, late
+
+    def format_news_report(self, results, late=()):
+        """格式化新闻报告：results 为 新闻源名称 -> 新闻列表，late 为超时未返回的新闻源"""
         report = []
         report.append("=" * 60)
         report.append(f"📰 每日新闻早报 - {datetime.now().strftime('%Y年%m月%d日 %A')}")
         report.append("=" * 60)
         report.append("")
 
-        if zhihu_news:
-            report.append("🔥 知乎热榜 TOP 10")
-            report.append("-" * 60)
-            for i, news in enumerate(zhihu_news, 1):
-                report.append(f"{i}. {news['title']}")
-                if news['excerpt']:
-                    report.append(f"   摘要: {news['excerpt'][:100]}...")
-                report.append(f"   链接: {news['url']}")
-                report.append("")
+        if late:
+            report.append(f"⏳ 以下新闻源超过 {self.deadline} 秒未返回，本次跳过: {', '.join(late)}")
+            report.append("")
 
-        if weibo_news:
-            report.append("🔥 微博热搜 TOP 10")
+        for source in self.sources:
+            news_list = results.get(source.name)
+            if not news_list:
+                continue
+            report.append(source.heading)
             report.append("-" * 60)
-            for i, news in enumerate(weibo_news, 1):
-                report.append(f"{i}. {news['title']} (热度: {news['hot_value']})")
+            for i, news in enumerate(news_list, 1):
+                if news.get('hot_value'):
+                    report.append(f"{i}. {news['title']} (热度: {news['hot_value']})")
+                else:
+                    report.append(f"{i}. {news['title']}")
+                if news.get('summary'):
+                    report.append(f"   摘要: {news['summary'][:100]}...")
+                if news.get('time'):
+                    report.append(f"   时间: {news['time']}")
                 report.append(f"   链接: {news['url']}")
-                report.append("")
-
-        if kr_news:
-            report.append("💼 36氪快讯")
-            report.append("-" * 60)
-            for i, news in enumerate(kr_news, 1):
-                report.append(f"{i}. {news['title']}")
-                if news['summary']:
-                    report.append(f"   {news['summary'][:100]}...")
-                report.append(f"   时间: {news['time']}")
+                for name, url in news.get('also', []):
+                    report.append(f"   同时出现在{name}: {url}")
+                if news.get('first_seen'):
+                    report.append(f"   首次出现: {news['first_seen']}")
                 report.append("")
 
         report.append("=" * 60)
@@ -132,24 +238,43 @@ class NewsAggregator:
         """获取每日新闻"""
         print(f"\n⏰ 开始获取新闻... {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
-        # 获取各平台新闻
-        zhihu_news = self.get_zhihu_hot(10)
-        time.sleep(1)  # 避免请求过快
-
-        weibo_news = self.get_weibo_hot(10)
-        time.sleep(1)
+        # 并发获取各平台新闻（同一主机的请求由令牌桶限速）
+        results, late = self.fetch_all(10)
+        if self.cache is not None:
+            self.cache.flush()
+            print(f"💾 {self.cache.summary()}")
 
-        kr_news = self.get_36kr_news(10)
+        # 去重：不同新闻源的同一条新闻合并为一条
+        if self.deduplicator is not None:
+            results, merged = self.deduplicator.merge(results, [source.name for source in self.sources])
+            if merged:
+                print(f"🔗 合并了 {merged} 条重复新闻")
 
         # 格式化并保存
-        report = self.format_news_report(zhihu_news, weibo_news, kr_news)
+        report = self.format_news_report(results, late)
         print(report)
 
-        # 保存到文件
-        self.save_to_file(report)
+        # 保存到存档（没有存档时保存到文件）
+        if self.archive is not None:
+            count = self.archive.add_fetch(results)
+            print(f"✅ {count} 条新闻已保存到存档")
+        else:
+            self.save_to_file(report)
 
         return report
 
+def search_archive(archive):
+    """按关键词、日期范围查询存档"""
+    keywords = input("关键词（空格分隔，可留空）: ").strip()
+    start = input("开始日期 YYYY-MM-DD（可留空）: ").strip() or None
+    end = input("结束日期 YYYY-MM-DD（可留空）: ").strip() or None
+    results = archive.search(keywords, start, end)
+    for news in results:
+        hot = f" (热度: {news['hot_value']})" if news['hot_value'] else ''
+        print(f"{news['fetched_at']} [{news['source']} #{news['rank']}] {news['title']}{hot}")
+        print(f"   链接: {news['url']}")
+    print(f"共 {len(results)} 条")
+
 def run_scheduler():
     """运行定时任务"""
     aggregator = NewsAggregator()
@@ -174,8 +299,10 @@ if __name__ == "__main__":
     print("选择运行模式:")
     print("1. 立即获取一次新闻")
     print("2. 启动定时任务(每天早上8点)")
+    print("3. 查询新闻存档")
+    print("4. 导入当前目录下的 news_YYYYMMDD.txt 到存档")
 
-    choice = input("请输入选择 (1/2): ").strip()
+    choice = input("请输入选择 (1/2/3/4): ").strip()
 
     aggregator = NewsAggregator()
 
@@ -183,6 +310,12 @@ if __name__ == "__main__":
         aggregator.fetch_daily_news()
     elif choice == "2":
         run_scheduler()
+    elif choice == "3":
+        search_archive(aggregator.archive)
+    elif choice == "4":
+        files, count = aggregator.archive.import_directory(
+            '.', {source.heading: source.name for source in NEWS_SOURCES.values()})
+        print(f"✅ 从 {files} 个文件导入 {count} 条新闻")
     else:
         print("无效选择，默认立即运行一次")
-        aggregator.fetch_daily_news()
\ No newline at end of file
+        aggregator.fetch_daily_news()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+news_archive 导入早期 txt 报告、短关键词查询的测试
+py -m unittest test_news_archive
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import news_archive
+from news_archive import NewsArchive
+
+# 最早版本 format_news_report 的输出：36氪摘要没有“摘要:”标签，也没有链接行
+BASELINE_REPORT = """============================================================
+📰 每日新闻早报 - 2024年03月05日 Tuesday
+============================================================
+
+🔥 知乎热榜 TOP 10
+------------------------------------------------------------
+1. 如何看待今年高考作文题？
+   摘要: 今年的作文题围绕科技与人文展开...
+   链接: https://www.zhihu.com/question/1
+
+🔥 微博热搜 TOP 10
+------------------------------------------------------------
+1. 台风登陆广东 (热度: 1200)
+   链接: https://s.weibo.com/weibo?q=%23台风%23
+
+💼 36氪快讯
+------------------------------------------------------------
+1. 某公司完成B轮融资
+   本轮融资5亿元，由某资本领投: 资金将用于研发...
+   时间: 2024-03-05 07:30:00
+
+============================================================
+生成时间: 2024-03-05 08:00:03
+============================================================"""
+
+class ImportBaselineReportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'news_20240305.txt')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(BASELINE_REPORT)
+        self.archive = NewsArchive(os.path.join(self.directory.name, 'archive.db'))
+
+    def tearDown(self):
+        self.archive.close()
+        self.directory.cleanup()
+
+    def test_import_keeps_unlabelled_summary(self):
+        self.assertEqual(self.archive.import_text(self.path), 3)
+        news = {item['source']: item for item in self.archive.search()}
+        self.assertEqual(set(news), {'知乎热榜', '微博热搜', '36氪快讯'})
+
+        kr = news['36氪快讯']
+        self.assertEqual(kr['summary'], '本轮融资5亿元，由某资本领投: 资金将用于研发')
+        self.assertEqual(kr['time'], '2024-03-05 07:30:00')
+        self.assertEqual(kr['url'], '')
+        self.assertEqual(news['知乎热榜']['summary'], '今年的作文题围绕科技与人文展开')
+        self.assertEqual(news['微博热搜']['hot_value'], 1200)
+        self.assertEqual(kr['fetched_at'], '2024-03-05 08:00:03')
+
+        # 摘要进入全文索引，可按摘要中的关键词查到
+        self.assertEqual([item['title'] for item in self.archive.search('资本领投')], ['某公司完成B轮融资'])
+
+    def test_import_twice_is_noop(self):
+        self.archive.import_text(self.path)
+        self.assertEqual(self.archive.import_text(self.path), 0)
+        self.assertEqual(len(self.archive.search()), 3)
+
+SHORT_RESULTS = {
+    '微博热搜': [{'title': '台风登陆广东', 'hot_value': 1200, 'url': 'https://s.weibo.com/1'},
+                 {'title': 'A股三大指数收涨', 'hot_value': 800, 'url': 'https://s.weibo.com/2'}],
+    '36氪快讯': [{'title': '某公司发布5G芯片', 'summary': '新芯片面向物联网设备', 'url': 'https://36kr.com/1'}],
+}
+
+class ShortKeywordTest(unittest.TestCase):
+    """trigram 匹配不了 1~2 个字、二元组匹配不了 1 个字的关键词，走 items_short 索引"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'archive.db')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def titles(self, archive, keywords):
+        return sorted(item['title'] for item in archive.search(keywords))
+
+    def check_short_keywords(self, archive):
+        self.assertEqual(self.titles(archive, '台'), ['台风登陆广东'])
+        self.assertEqual(self.titles(archive, '芯片'), ['某公司发布5G芯片'])
+        self.assertEqual(self.titles(archive, '5g'), ['某公司发布5G芯片'])
+        self.assertEqual(self.titles(archive, 'a股'), ['A股三大指数收涨'])
+        # 摘要中的短关键词，与长关键词组合
+        self.assertEqual(self.titles(archive, '物联 某公司'), ['某公司发布5G芯片'])
+        self.assertEqual(self.titles(archive, '台 芯片'), [])
+
+    def test_trigram(self):
+        archive = NewsArchive(self.path)
+        try:
+            if archive.tokenizer != 'trigram':
+                self.skipTest('SQLite 不支持 trigram 分词器')
+            archive.add_fetch(SHORT_RESULTS)
+            self.check_short_keywords(archive)
+        finally:
+            archive.close()
+
+    def test_bigram(self):
+        with mock.patch.object(news_archive, 'trigram_supported', return_value=False):
+            archive = NewsArchive(self.path)
+        try:
+            self.assertEqual(archive.tokenizer, 'bigram')
+            archive.add_fetch(SHORT_RESULTS)
+            self.check_short_keywords(archive)
+        finally:
+            archive.close()
+
+    def test_short_index_rebuilt_for_old_archive(self):
+        archive = NewsArchive(self.path)
+        archive.add_fetch(SHORT_RESULTS)
+        # 之前版本建的库没有 items_short
+        archive.conn.execute('DROP TABLE items_short')
+        archive.close()
+
+        archive = NewsArchive(self.path)
+        try:
+            self.check_short_keywords(archive)
+        finally:
+            archive.close()
+
+if __name__ == '__main__':
+    unittest.main()